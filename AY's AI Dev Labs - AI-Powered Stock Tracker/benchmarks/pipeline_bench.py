@@ -0,0 +1,196 @@
+# This program times each stage of the stock data pipeline on synthetic
+# prices and catches performance regressions.
+#
+# Stages measured (each on the same synthetic watchlist, through the same
+# stock_nums functions get_price_table uses):
+# - fetch_cold: fetching every ticker's daily closes in batches on the thread
+#               pool into an empty price cache (from a ReplaySource over generated
+#               CSV files, so no network is used)
+# - fetch:      the same fetch again, now answered by the price cache
+# - resample:   picking the first trading day of each month
+# - convert:    packing the sampled prices into a PriceTable
+# - render:     drawing every ticker on one line graph with the Agg backend
+#
+# Every run gets a new temporary cache folder, so fetch_cold always starts empty.
+#
+# For every stage the median time over a few repeats and the peak memory
+# (as seen by tracemalloc, which includes NumPy arrays) are reported and
+# compared against a saved baseline for the same fixture size. Tracing every
+# allocation slows Python-heavy stages down several times over, so the peak
+# memory comes from one extra run of its own that is not timed.
+#
+# How To Use (from the tracker folder):
+#   py benchmarks/pipeline_bench.py --tickers 200 --days 2520
+#   py benchmarks/pipeline_bench.py --tickers 200 --days 2520 --save-baseline
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TRACKER_DIR)
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import charts.line_graph
+import stock_data.concurrent_fetch
+import stock_data.sources
+import stock_nums
+
+
+BASELINE_PATH = os.path.join(TRACKER_DIR, "benchmarks", "pipeline_baseline.json")
+
+# A stage only counts as slower (or bigger) if it is both this much worse in relative terms...
+TOLERANCE = 0.25
+# ...and worse by at least this much (to ignore noise on very fast stages)
+MIN_SLOWDOWN_SECONDS = 0.02
+MIN_GROWTH_MB = 1.0
+
+
+# A ReplaySource whose answers go through the price cache like a real provider's,
+# so the benchmark times the cache as well.
+class CacheableReplaySource(stock_data.sources.ReplaySource):
+    cacheable = True
+
+
+# Writes random-walk daily closes for "tickers" tickers over the last "days"
+# business days into folder, as ReplaySource files.
+def make_fixtures(folder: str, tickers: int, days: int, seed: int = 0) -> list[str]:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp(date.today()) - pd.Timedelta(days=1), periods=days)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(tickers, days)), axis=1))
+
+    names = [f"T{i:05d}" for i in range(tickers)]
+    for name, row in zip(names, prices):
+        stock_data.sources.write_replay_file(folder, name, pd.Series(row, index=dates))
+    return names
+
+
+# Runs a function and returns (result, seconds), or (result, peak_megabytes)
+# when trace_memory is True.
+def _measure(function, trace_memory: bool):
+    if not trace_memory:
+        start = time.perf_counter()
+        result = function()
+        return result, time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+# Runs every pipeline stage once and returns {stage: seconds}, or
+# {stage: peak_mb} when trace_memory is True.
+def run_pipeline_once(folder: str, tickers: list[str], days: int, trace_memory: bool = False) -> dict:
+    source = CacheableReplaySource(folder)  # new source, so files are read again
+    end = date.today()
+    start = (pd.Timestamp(end) - pd.Timedelta(days=int(days * 1.5) + 7)).date()
+    timings = {}
+
+    def fetch():
+        return stock_nums._fetch_closes_concurrent(
+            tickers, start, end, stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+            stock_data.concurrent_fetch.DEFAULT_TIMEOUT, stock_data.concurrent_fetch.DEFAULT_RETRIES, None, source,
+            cache_dir=cache_dir)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, timings["fetch_cold"] = _measure(fetch, trace_memory)
+        closes, timings["fetch"] = _measure(fetch, trace_memory)
+
+    sampled, timings["resample"] = _measure(lambda: stock_nums._resample_closes(closes, start, "monthly"),
+                                            trace_memory)
+    _, timings["convert"] = _measure(lambda: stock_nums._to_price_table(tickers, sampled), trace_memory)
+
+    def render():
+        figure = Figure(figsize=(10, 6))
+        canvas = FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        charts.line_graph.plot_lines(axes, [closes[ticker].to_numpy() for ticker in tickers], tickers,
+                                     "Benchmark", "Days", "Price")
+        canvas.draw()
+
+    _, timings["render"] = _measure(render, trace_memory)
+    return timings
+
+
+# Runs the pipeline "repeats" times plus once more with memory tracing, and
+# returns {stage: {"seconds", "peak_mb"}} with the median seconds.
+def run_benchmark(tickers: int, days: int, repeats: int) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        names = make_fixtures(folder, tickers, days)
+        runs = [run_pipeline_once(folder, names, days) for _ in range(repeats)]
+        peaks = run_pipeline_once(folder, names, days, trace_memory=True)
+
+    return {stage: {"seconds": statistics.median(run[stage] for run in runs), "peak_mb": peaks[stage]}
+            for stage in runs[0]}
+
+
+# Returns a list of human-readable regressions compared with the baseline.
+def find_regressions(measured: dict, baseline: dict) -> list[str]:
+    problems = []
+    for stage, before in baseline.items():
+        if stage not in measured:
+            continue
+        after = measured[stage]
+        if (after["seconds"] > before["seconds"] * (1 + TOLERANCE)
+                and after["seconds"] - before["seconds"] > MIN_SLOWDOWN_SECONDS):
+            problems.append(f"{stage} went from {before['seconds']:.3f} s to {after['seconds']:.3f} s")
+        if (after["peak_mb"] > before["peak_mb"] * (1 + TOLERANCE)
+                and after["peak_mb"] - before["peak_mb"] > MIN_GROWTH_MB):
+            problems.append(f"{stage} peak memory went from {before['peak_mb']:.1f} MB to {after['peak_mb']:.1f} MB")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time each stage of the stock data pipeline.")
+    parser.add_argument("--tickers", type=int, default=100, help="number of synthetic tickers")
+    parser.add_argument("--days", type=int, default=2520, help="trading days per ticker")
+    parser.add_argument("--repeats", type=int, default=3, help="runs to take the median of")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the baseline for this size")
+    args = parser.parse_args()
+
+    measured = run_benchmark(args.tickers, args.days, args.repeats)
+    size = f"{args.tickers}x{args.days}"
+
+    print(f"Pipeline benchmark for {args.tickers} tickers x {args.days} days")
+    print(f"{'stage':<12}{'seconds':>10}{'peak MB':>10}")
+    for stage, result in measured.items():
+        print(f"{stage:<12}{result['seconds']:>10.3f}{result['peak_mb']:>10.1f}")
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[size] = measured
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {size} to {BASELINE_PATH}")
+        return 0
+
+    if size not in baselines:
+        print(f"No baseline saved for {size} yet (run with --save-baseline to record one).")
+        return 0
+
+    problems = find_regressions(measured, baselines[size])
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
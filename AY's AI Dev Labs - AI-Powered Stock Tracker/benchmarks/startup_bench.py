@@ -0,0 +1,120 @@
+# This program measures how long it takes to import the stock tracker, broken
+# down per imported module, and catches startup regressions.
+#
+# It runs "python -X importtime -c 'import stock_nums'" a few times in fresh
+# processes and keeps the median time of every module. Two things count as a
+# regression:
+# - a module that must stay lazy (pygame, pyplot, yfinance) gets imported, or
+# - a module got noticeably slower than in the saved baseline file.
+#
+# How To Use (from the tracker folder):
+#   py benchmarks/startup_bench.py                  compare with the baseline
+#   py benchmarks/startup_bench.py --save-baseline  record a new baseline
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(TRACKER_DIR, "benchmarks", "startup_baseline.json")
+
+# Modules that only interactive runs need, so "import stock_nums" must not load them
+MUST_STAY_LAZY = ("pygame", "matplotlib.pyplot", "yfinance")
+
+# A module only counts as slower if it is both this much slower in relative terms...
+TOLERANCE = 0.25
+# ...and at least this many microseconds slower (to ignore noise on tiny modules)
+MIN_SLOWDOWN_US = 5000
+
+
+# Imports target in a fresh interpreter and returns {module: (self_us, cumulative_us)}.
+def _import_times_once(target: str) -> dict:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                            cwd=TRACKER_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # Lines look like: "import time:       157 |        157 |   stock_data.resample"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+# Imports target several times and returns {module: {"self_us", "cumulative_us"}} medians.
+def measure_imports(target: str = "stock_nums", runs: int = 5) -> dict:
+    samples = [_import_times_once(target) for _ in range(runs)]
+    modules = set().union(*samples)
+
+    medians = {}
+    for module in modules:
+        values = [sample[module] for sample in samples if module in sample]
+        medians[module] = {"self_us": int(statistics.median(v[0] for v in values)),
+                           "cumulative_us": int(statistics.median(v[1] for v in values))}
+    return medians
+
+
+# Returns a list of human-readable problems found in a measurement.
+def find_regressions(measured: dict, baseline: dict, target: str) -> list[str]:
+    problems = []
+    for module in MUST_STAY_LAZY:
+        if module in measured:
+            problems.append(f"{module} is imported by 'import {target}' but should only be imported when used")
+
+    for module, times in baseline.items():
+        if module not in measured:
+            continue
+        before, after = times["cumulative_us"], measured[module]["cumulative_us"]
+        if after > before * (1 + TOLERANCE) and after - before > MIN_SLOWDOWN_US:
+            problems.append(f"{module} import went from {before / 1000:.1f} ms to {after / 1000:.1f} ms")
+    return problems
+
+
+# Prints the slowest modules by cumulative import time.
+def print_report(measured: dict, target: str, top: int = 15) -> None:
+    total = measured.get(target, {}).get("cumulative_us", 0)
+    print(f"'import {target}' took {total / 1000:.1f} ms")
+    print(f"{'module':<45}{'self ms':>10}{'total ms':>10}")
+    slowest = sorted(measured.items(), key=lambda item: item[1]["cumulative_us"], reverse=True)[:top]
+    for module, times in slowest:
+        print(f"{module:<45}{times['self_us'] / 1000:>10.1f}{times['cumulative_us'] / 1000:>10.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the stock tracker's import time per module.")
+    parser.add_argument("--target", default="stock_nums", help="module to import (default: stock_nums)")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh imports to take the median of")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    measured = measure_imports(args.target, args.runs)
+    print_report(measured, args.target)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(measured, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {BASELINE_PATH}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    else:
+        print("No baseline saved yet; only checking lazy imports (run with --save-baseline to record one).")
+
+    problems = find_regressions(measured, baseline, args.target)
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# This module writes line graphs straight to image files without opening a
+# window, so charts can be made under cron or on a server.
+#
+# It never imports pyplot: each process draws on a single Agg-backed Figure
+# whose axes are cleared and reused for every chart instead of creating a new
+# figure each time.
+# Large batches can be split across several processes.
+
+import multiprocessing
+import os
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import charts.line_graph
+
+
+# Default export settings
+FIGURE_SIZE = (10, 6)  # inches, the same as the interactive window
+DEFAULT_DPI = 100
+EXPORT_FORMATS = ("png", "svg", "pdf")
+
+# The figure (and its axes) reused by every chart drawn in this process
+_figure = None
+_axes = None
+
+
+# Returns this process's reusable figure and axes, creating them on first use.
+def _get_figure():
+    global _figure, _axes
+    if _figure is None:
+        _figure = Figure(figsize=FIGURE_SIZE)
+        FigureCanvasAgg(_figure)
+        _axes = _figure.add_subplot()
+    return _figure, _axes
+
+
+# Turns a chart name into a safe file name.
+def _file_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+# Draws one chart on the reused figure and saves it in every format.
+#
+# A chart is a dict with the keys "name", "data" and "labels", and optionally
+# "title", "xlabel", "ylabel", "fast", "value_labels" and "downsample" (see plot_lines).
+#
+# Returns the paths of the files written.
+#
+def _render_chart(chart: dict, out_dir: str, formats, dpi: int) -> list[str]:
+    figure, axes = _get_figure()
+    axes.clear()
+
+    charts.line_graph.plot_lines(axes, chart["data"], chart.get("labels"), chart.get("title", chart["name"]),
+                                 chart.get("xlabel", ""), chart.get("ylabel", ""),
+                                 fast=chart.get("fast"), value_labels=chart.get("value_labels"),
+                                 downsample=chart.get("downsample"))
+    figure.tight_layout()
+
+    paths = []
+    for file_format in formats:
+        path = os.path.join(out_dir, f"{_file_name(chart['name'])}.{file_format}")
+        figure.savefig(path, format=file_format, dpi=dpi)
+        paths.append(path)
+    return paths
+
+
+# Renders a list of charts in this process. Used as the worker of export_charts.
+def _render_charts(charts_to_render: list[dict], out_dir: str, formats, dpi: int) -> list[str]:
+    paths = []
+    for chart in charts_to_render:
+        paths.extend(_render_chart(chart, out_dir, formats, dpi))
+    return paths
+
+
+# Writes every chart to image files in out_dir.
+#
+# Parameters:
+# - charts_to_render: List of chart dicts (see _render_chart).
+# - out_dir: Folder the images are written to (created if needed).
+# - formats: Image formats to write, any of "png", "svg" and "pdf".
+# - processes: Number of processes to split the charts across. 1 draws
+#   everything in the current process.
+# - dpi: Resolution of raster images.
+#
+# Returns the paths of all files written.
+#
+def export_charts(charts_to_render: list[dict], out_dir: str, formats=("png",), processes: int = 1,
+                  dpi: int = DEFAULT_DPI) -> list[str]:
+    for file_format in formats:
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format '{file_format}'. Choose from: {', '.join(EXPORT_FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    processes = max(1, min(processes, len(charts_to_render)))
+    if processes == 1:
+        return _render_charts(charts_to_render, out_dir, formats, dpi)
+
+    # Give each process an equal share of the charts so each figure is reused as much as possible
+    shares = [charts_to_render[i::processes] for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(_render_charts, [(share, out_dir, formats, dpi) for share in shares])
+    return [path for paths in results for path in paths]
@@ -0,0 +1,232 @@
+# This module is the high-volume drawing path used by draw_line_graph when
+# there are too many points to draw one marker and one text label per point.
+#
+# All series go into a single LineCollection, each series is first cut down
+# to about one point per horizontal pixel, and value labels are only placed
+# at a handful of points per series.
+#
+# Two ways of cutting series down are offered: min/max decimation, which
+# keeps every spike visible, and Largest-Triangle-Three-Buckets (LTTB), which
+# keeps one point per bucket chosen to preserve the visual shape of the line.
+
+import matplotlib
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+
+
+# Most series that still get their own legend entry and value labels by default
+MAX_LABELLED_SERIES = 20
+
+# Supported value label modes
+VALUE_LABEL_MODES = ("all", "extrema", "ends", "none")
+
+# Supported downsampling methods
+DOWNSAMPLE_METHODS = ("minmax", "lttb")
+
+
+# Returns one colour per series, following matplotlib's default colour cycle.
+def series_colors(count: int) -> list:
+    colors = matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]
+    return [colors[i % len(colors)] for i in range(count)]
+
+
+# Stacks a list of 1-D series into one 2-D array, padding short rows with NaN.
+def _stack(data_arrays) -> np.ndarray:
+    lengths = [len(values) for values in data_arrays]
+    stacked = np.full((len(data_arrays), max(lengths)), np.nan)
+    for i, values in enumerate(data_arrays):
+        stacked[i, :lengths[i]] = values
+    return stacked
+
+
+# Cuts every row of a 2-D array down to at most 2 * buckets points, keeping the
+# lowest and highest value of each bucket in their original order.
+#
+# Parameters:
+# - values: 2-D array, one series per row (NaN is treated as missing).
+# - buckets: Number of buckets per row, usually the plot width in pixels.
+#
+# Returns (x, y): two arrays of the same shape holding the kept points, where
+# x is the original position of each point in its row.
+#
+def decimate_minmax(values: np.ndarray, buckets: int):
+    rows, length = values.shape
+    if buckets < 1 or length <= 2 * buckets:
+        x = np.broadcast_to(np.arange(length, dtype=np.float64), values.shape)
+        return x, values
+
+    # Pad each row to a whole number of equal buckets
+    bucket_size = -(-length // buckets)
+    buckets = -(-length // bucket_size)
+    padded = np.full((rows, buckets * bucket_size), np.nan)
+    padded[:, :length] = values
+    grouped = padded.reshape(rows, buckets, bucket_size)
+
+    # Position of the min and max inside each bucket (missing values never win)
+    missing = np.isnan(grouped)
+    low_at = np.where(missing, np.inf, grouped).argmin(axis=2)
+    high_at = np.where(missing, -np.inf, grouped).argmax(axis=2)
+
+    # Keep both points per bucket, in the order they happened
+    bucket_start = (np.arange(buckets) * bucket_size)[None, :, None]
+    picked = np.sort(np.stack([low_at, high_at], axis=2), axis=2) + bucket_start
+    picked = picked.reshape(rows, 2 * buckets)
+
+    y = np.take_along_axis(padded, picked, axis=1)
+    x = np.minimum(picked, length - 1).astype(np.float64)
+    return x, y
+
+
+# Cuts every row of a 2-D array down to "points" points with the
+# Largest-Triangle-Three-Buckets algorithm. The first and last points are
+# kept, the rest are split into equal buckets, and from each bucket the point
+# forming the largest triangle with the previously kept point and the average
+# of the next bucket is kept.
+#
+# The buckets have to be walked in order (each choice depends on the one
+# before), but every step handles all rows at once.
+#
+# Shorter series padded with NaN at the end (see _stack) are cut down over
+# their own length, to a proportional share of the points, so each one still
+# ends on its own last value. Rows come back padded to "points" points with NaN
+# values sitting on their last x.
+#
+# Parameters:
+# - values: 2-D array, one series per row (NaN is treated as missing).
+# - points: Number of points to keep per row (at least 3).
+#
+# Returns (x, y) like decimate_minmax.
+#
+def decimate_lttb(values: np.ndarray, points: int):
+    rows, length = values.shape
+    if points < 3 or length <= points:
+        x = np.broadcast_to(np.arange(length, dtype=np.float64), values.shape)
+        return x, values
+
+    # Length of each row up to and including its last value
+    present = ~np.isnan(values)
+    lengths = np.where(present.any(axis=1), length - present[:, ::-1].argmax(axis=1), 0)
+
+    x = np.zeros((rows, points))
+    y = np.full((rows, points), np.nan)
+    for row_length in np.unique(lengths[lengths > 0]).tolist():
+        group = lengths == row_length
+        row_points = min(points, max(3, -(-points * row_length // length)))
+        if row_length <= row_points:
+            group_x = np.broadcast_to(np.arange(row_length, dtype=np.float64), (group.sum(), row_length))
+            group_y = values[group, :row_length]
+        else:
+            group_x, group_y = _lttb_rows(values[group, :row_length], row_points)
+        kept = group_x.shape[1]
+        x[group, :kept] = group_x
+        x[group, kept:] = group_x[:, -1:]
+        y[group, :kept] = group_y
+    return x, y
+
+
+# LTTB over rows that all end on a value at their last position.
+def _lttb_rows(values: np.ndarray, points: int):
+    rows, length = values.shape
+
+    # points - 2 buckets between the first and last point
+    edges = np.linspace(1, length - 1, points - 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket, ignoring missing values
+    present = ~np.isnan(values[:, :length - 1])
+    sums = np.add.reduceat(np.where(present, values[:, :length - 1], 0.0), starts, axis=1)
+    counts = np.add.reduceat(present, starts, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_y = sums / counts
+    average_x = (starts + ends - 1) / 2
+
+    # The "next bucket" of the last bucket is the last point
+    next_x = np.append(average_x[1:], length - 1)
+    next_y = np.concatenate([average_y[:, 1:], values[:, -1:]], axis=1)
+
+    picked = np.empty((rows, points), dtype=np.intp)
+    picked[:, 0] = 0
+    picked[:, -1] = length - 1
+    row_index = np.arange(rows)
+    for bucket in range(points - 2):
+        start, end = starts[bucket], ends[bucket]
+        previous_x = picked[:, bucket].astype(np.float64)[:, None]
+        previous_y = values[row_index, picked[:, bucket]][:, None]
+
+        # Twice the area of the triangle (previous point, candidate, next average)
+        candidate_x = np.arange(start, end, dtype=np.float64)[None, :]
+        areas = np.abs((previous_x - next_x[bucket]) * (values[:, start:end] - previous_y)
+                       - (previous_x - candidate_x) * (next_y[:, bucket:bucket + 1] - previous_y))
+        areas[np.isnan(areas)] = -np.inf
+        picked[:, bucket + 1] = start + areas.argmax(axis=1)
+
+    return picked.astype(np.float64), np.take_along_axis(values, picked, axis=1)
+
+
+# Returns the positions in one series that get a value label.
+def _label_positions(values: np.ndarray, mode: str) -> list[int]:
+    valid = np.flatnonzero(~np.isnan(values))
+    if mode == "none" or len(valid) == 0:
+        return []
+    if mode == "all":
+        return valid.tolist()
+
+    positions = {int(valid[0]), int(valid[-1])}
+    if mode == "extrema":
+        positions.add(int(np.nanargmin(values)))
+        positions.add(int(np.nanargmax(values)))
+    return sorted(positions)
+
+
+# Draws many series onto one axes as a single LineCollection.
+#
+# Parameters:
+# - axes: The matplotlib axes to draw on.
+# - data_arrays: List of series (lists or arrays of floats), or a 2-D array.
+# - labels: One label per series.
+# - value_labels: "all", "extrema", "ends" or "none". None picks "extrema" when
+#   there are at most MAX_LABELLED_SERIES series and "none" otherwise.
+# - downsample: "minmax" (the default) keeps the low and high of every pixel
+#   column, "lttb" keeps one shape-preserving point per pixel column.
+#
+def draw_many_lines(axes, data_arrays, labels, value_labels: str = None, downsample: str = None) -> None:
+    values = _stack(data_arrays) if not isinstance(data_arrays, np.ndarray) else np.asarray(data_arrays, dtype=float)
+    rows, length = values.shape
+
+    if value_labels is None:
+        value_labels = "extrema" if rows <= MAX_LABELLED_SERIES else "none"
+    if value_labels not in VALUE_LABEL_MODES:
+        raise ValueError(f"value_labels must be one of: {', '.join(VALUE_LABEL_MODES)}")
+    if downsample is None:
+        downsample = "minmax"
+    if downsample not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"downsample must be one of: {', '.join(DOWNSAMPLE_METHODS)}")
+
+    # Min/max keeps two points per bucket, so half as many buckets as the axes is
+    # wide in pixels leaves about one point per pixel column
+    width_px = int(axes.get_window_extent().width) or int(axes.figure.get_figwidth() * axes.figure.dpi)
+    if downsample == "lttb":
+        x, y = decimate_lttb(values, max(3, width_px))
+    else:
+        x, y = decimate_minmax(values, max(1, width_px // 2))
+
+    row_colors = series_colors(rows)
+
+    segments = np.stack([np.broadcast_to(x, y.shape), y], axis=2)
+    axes.add_collection(LineCollection(segments, colors=row_colors, linewidths=1.5 if rows > 1 else 2))
+
+    axes.set_xlim(0, max(length - 1, 1))
+    low, high = np.nanmin(values), np.nanmax(values)
+    margin = (high - low) * 0.05 or 1.0
+    axes.set_ylim(low - margin, high + margin)
+
+    # Value labels at a few points per series, read from the full (undecimated) data
+    for i in range(rows):
+        for xi in _label_positions(values[i], value_labels):
+            axes.text(xi, values[i, xi], f"{values[i, xi]:.2f}", ha='center', va='bottom', fontsize=8)
+
+    # A LineCollection has no per-line legend entries, so add stand-ins when it's readable
+    if rows <= MAX_LABELLED_SERIES:
+        handles = [Line2D([], [], color=row_colors[i], linewidth=2) for i in range(rows)]
+        axes.legend(handles, labels)
@@ -0,0 +1,41 @@
+# This module draws a ticker-by-ticker matrix (such as return correlations)
+# as a colour-coded heatmap.
+
+
+# Above this many tickers, tick labels and cell values are left out so the
+# heatmap stays readable (and fast to draw)
+MAX_LABELLED_TICKERS = 30
+MAX_ANNOTATED_TICKERS = 12
+
+
+# Draws a square matrix as a heatmap on the given axes.
+#
+# Parameters:
+# - axes: The matplotlib axes to draw on.
+# - matrix: N x N array (e.g. from stock_data.correlation.correlation_matrix).
+# - labels: One label per row/column.
+# - title: Title of the heatmap.
+# - value_range: (low, high) of the colour scale; (-1, 1) suits correlations.
+#
+def plot_heatmap(axes, matrix, labels, title: str, value_range=(-1.0, 1.0)) -> None:
+    count = len(labels)
+    image = axes.imshow(matrix, cmap="RdYlGn", vmin=value_range[0], vmax=value_range[1],
+                        interpolation="nearest")
+    axes.figure.colorbar(image, ax=axes, fraction=0.046, pad=0.04)
+
+    if count <= MAX_LABELLED_TICKERS:
+        axes.set_xticks(range(count))
+        axes.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+        axes.set_yticks(range(count))
+        axes.set_yticklabels(labels, fontsize=8)
+    else:
+        axes.set_xticks([])
+        axes.set_yticks([])
+
+    # Show the value in each cell when there are few enough of them
+    if count <= MAX_ANNOTATED_TICKERS:
+        for i in range(count):
+            for j in range(count):
+                axes.text(j, i, f"{matrix[i][j]:.2f}", ha='center', va='center', fontsize=8)
+
+    axes.set_title(title, fontsize=14)
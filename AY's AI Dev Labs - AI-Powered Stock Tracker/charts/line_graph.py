@@ -0,0 +1,84 @@
+# This module draws the tracker's line graph onto any matplotlib axes, so the
+# same drawing code is used by the interactive window (draw_line_graph in
+# stock_nums.py) and by headless exports (charts/export.py).
+
+import numpy as np
+
+import charts.fast_render
+
+
+# Above this many points in total, plot_lines switches to the fast rendering path
+FAST_RENDER_THRESHOLD = 5000
+
+
+# Plots lines on the given axes.
+#
+# Parameters:
+# - axes: The matplotlib axes to draw on.
+# - data_arrays: List of lists of floats. Each sub-list is one line.
+# - labels: Optional list of labels for each line.
+# - title: Title of the graph.
+# - xlabel: Label for the X-axis.
+# - ylabel: Label for the Y-axis.
+# - fast: Use the high-volume path (one LineCollection, min/max decimation to the
+#   plot width, few value labels). None picks it automatically for large data.
+# - value_labels: Which points get a value label in the fast path: "all",
+#   "extrema", "ends" or "none" (see charts.fast_render.draw_many_lines).
+# - downsample: How the fast path cuts lines down to the plot width: "minmax"
+#   (the default) or "lttb" (see charts.fast_render.draw_many_lines).
+# - forecasts: Optional list with one array of future values per line (or None
+#   for no forecast). Each is drawn as a dashed continuation of its line.
+#
+def plot_lines(axes, data_arrays, labels, title: str, xlabel: str, ylabel: str, fast: bool = None,
+               value_labels: str = None, forecasts=None, downsample: str = None) -> None:
+    num_lines = len(data_arrays)
+
+    # If no labels provided, generate default ones
+    if labels is None or len(labels) != num_lines:
+        labels = [f"Line {i+1}" for i in range(num_lines)]
+
+    if fast is None:
+        fast = sum(len(values) for values in data_arrays) > FAST_RENDER_THRESHOLD
+
+    if fast:
+        charts.fast_render.draw_many_lines(axes, data_arrays, labels, value_labels=value_labels,
+                                           downsample=downsample)
+    else:
+        for i, values in enumerate(data_arrays):
+            x = list(range(len(values)))  # X-axis indices
+            axes.plot(x, values, marker='o', linestyle='-', linewidth=2, markersize=6, label=labels[i])
+            # Optionally show values above each point
+            for xi, val in enumerate(values):
+                axes.text(xi, val, f"{val:.2f}", ha='center', va='bottom', fontsize=8)
+        axes.legend()
+
+    if forecasts is not None:
+        _plot_forecasts(axes, data_arrays, forecasts)
+
+    axes.set_title(title, fontsize=14)
+    axes.set_xlabel(xlabel, fontsize=12)
+    axes.set_ylabel(ylabel, fontsize=12)
+    axes.grid(True, linestyle='--', alpha=0.6)
+
+
+# Draws each forecast as a dashed line that starts at the last point of its line.
+def _plot_forecasts(axes, data_arrays, forecasts) -> None:
+    colors = charts.fast_render.series_colors(len(data_arrays))
+    last_x, low, high = None, np.inf, -np.inf
+    for i, (values, future) in enumerate(zip(data_arrays, forecasts)):
+        if future is None or len(values) == 0 or len(future) == 0:
+            continue
+        start = len(values) - 1
+        x = list(range(start, start + len(future) + 1))
+        y = [values[-1], *future]
+        axes.plot(x, y, linestyle='--', linewidth=2, color=colors[i], alpha=0.8)
+        last_x = max(x[-1], last_x or 0)
+        low, high = min(low, np.nanmin(future)), max(high, np.nanmax(future))
+
+    # The fast path fixes the axis limits to the data, so widen them to take in the forecasts
+    if last_x is not None and not axes.get_autoscalex_on():
+        left, right = axes.get_xlim()
+        axes.set_xlim(left, max(right, last_x))
+        bottom, top = axes.get_ylim()
+        margin = (max(top, high) - min(bottom, low)) * 0.05
+        axes.set_ylim(min(bottom, low - margin), max(top, high + margin))
@@ -0,0 +1,205 @@
+# This module runs the stock tracker in live mode.
+#
+# Quotes are polled at a fixed interval and pushed into a fixed-size ring
+# buffer per ticker. The chart keeps one Line2D per ticker and only updates
+# its data, redrawing just those lines on top of a saved background (blitting).
+# The window always shows the last "capacity" points, so the cost of a frame
+# stays the same no matter how long the chart has been running.
+#
+# Run it from the tracker folder with:
+#   py -m charts.live_chart AAPL AMZN GOOG NVDA --interval 5 --capacity 720
+# or through the main command line with "py stock_nums.py --output live".
+
+import argparse
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import stock_data.sources
+
+
+# Default settings for live mode
+DEFAULT_INTERVAL = stock_data.sources.LIVE_INTERVAL  # seconds between polls
+DEFAULT_CAPACITY = stock_data.sources.LIVE_CAPACITY  # points kept per ticker
+Y_MARGIN = 0.05          # extra room above/below the data when the y-axis is rescaled
+
+
+# Fixed-size ring buffer of floats.
+#
+# Every value is written twice, at i and i + capacity, so the newest
+# "capacity" values are always one contiguous slice and values() never copies.
+class RingBuffer:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.data = np.full(2 * capacity, np.nan)
+        self.next_index = 0
+        self.size = 0
+
+    def append(self, value: float) -> None:
+        self.data[self.next_index] = value
+        self.data[self.next_index + self.capacity] = value
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    # Returns the stored values, oldest to newest, as a view.
+    def values(self) -> np.ndarray:
+        start = self.next_index + self.capacity - self.size
+        return self.data[start:start + self.size]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+# A matplotlib chart that updates its lines in place.
+#
+# Parameters:
+# - tickers: The tickers shown, one line each.
+# - capacity: How many of the newest points are shown per ticker.
+# - title: Title of the chart.
+#
+class LiveChart:
+    def __init__(self, tickers: list[str], capacity: int = DEFAULT_CAPACITY,
+                 title: str = "Live Stock Prices"):
+        self.tickers = list(tickers)
+        self.capacity = capacity
+        self.buffers = {ticker: RingBuffer(capacity) for ticker in self.tickers}
+
+        self.figure, self.axes = plt.subplots(figsize=(10, 6))
+        self.axes.set_title(title, fontsize=14)
+        self.axes.set_xlabel(f"Last {capacity} Updates", fontsize=12)
+        self.axes.set_ylabel("Price of Stock (In USD)", fontsize=12)
+        self.axes.grid(True, linestyle='--', alpha=0.6)
+
+        # The x-axis is the position in the window, with the newest point on the right
+        self.axes.set_xlim(0, capacity - 1)
+        self.x_positions = np.arange(capacity, dtype=np.float64)
+
+        # Lines are "animated" so a normal draw leaves them out of the saved background
+        self.lines = {}
+        for ticker in self.tickers:
+            (line,) = self.axes.plot([], [], linewidth=2, label=ticker, animated=True)
+            self.lines[ticker] = line
+        self.axes.legend(loc="upper left")
+
+        self.background = None
+        self.y_limits = None
+        self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # Saves the static part of the chart every time the whole figure is redrawn.
+    def _on_draw(self, event) -> None:
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self) -> None:
+        for line in self.lines.values():
+            self.axes.draw_artist(line)
+
+    # Returns True if the data no longer fits the current y-axis (which then gets
+    # rescaled). Only this case, which is rare after the first few points, needs
+    # a full redraw.
+    def _rescale_if_needed(self) -> bool:
+        filled = [buffer.values() for buffer in self.buffers.values() if len(buffer)]
+        if not filled:
+            return False
+        low = min(float(np.nanmin(values)) for values in filled)
+        high = max(float(np.nanmax(values)) for values in filled)
+
+        if self.y_limits is not None and self.y_limits[0] <= low and high <= self.y_limits[1]:
+            return False
+
+        margin = max((high - low) * Y_MARGIN, abs(high) * 0.001, 0.01)
+        self.y_limits = (low - margin, high + margin)
+        self.axes.set_ylim(*self.y_limits)
+        return True
+
+    # Adds the newest price of each ticker (tickers missing from prices are skipped)
+    # and refreshes the chart.
+    def push(self, prices: dict[str, float]) -> None:
+        for ticker, price in prices.items():
+            if ticker in self.buffers:
+                self.buffers[ticker].append(price)
+
+        for ticker, line in self.lines.items():
+            values = self.buffers[ticker].values()
+            line.set_data(self.x_positions[self.capacity - len(values):], values)
+
+        canvas = self.figure.canvas
+        if self._rescale_if_needed() or self.background is None:
+            canvas.draw()  # also saves a new background through _on_draw
+        else:
+            canvas.restore_region(self.background)
+            self._draw_lines()
+            canvas.blit(self.figure.bbox)
+        canvas.flush_events()
+
+    def is_open(self) -> bool:
+        return plt.fignum_exists(self.figure.number)
+
+
+# Polls quotes and updates a LiveChart until its window is closed.
+#
+# Parameters:
+# - tickers: The tickers to watch.
+# - interval: Seconds between polls.
+# - capacity: How many of the newest points are shown per ticker.
+# - source: PriceSource to poll (stock_data.sources.default_source() if None).
+# - max_updates: Optional number of polls after which to stop (runs until closed if None).
+#
+def run_live_chart(tickers: list[str], interval: float = DEFAULT_INTERVAL, capacity: int = DEFAULT_CAPACITY,
+                   source: stock_data.sources.PriceSource = None, max_updates: int = None) -> LiveChart:
+    if source is None:
+        source = stock_data.sources.default_source()
+
+    chart = LiveChart(tickers, capacity=capacity)
+    plt.show(block=False)
+
+    updates = 0
+    while chart.is_open() and (max_updates is None or updates < max_updates):
+        poll_start = time.monotonic()
+        try:
+            chart.push(source.get_latest_prices(chart.tickers))
+        except Exception as error:
+            # Keep the chart running through a failed poll; the next one may work
+            print(f"Could not get live prices: {error}")
+        updates += 1
+
+        # Wait out the rest of the interval while keeping the window responsive
+        remaining = interval - (time.monotonic() - poll_start)
+        if remaining > 0 and chart.is_open():
+            chart.figure.canvas.start_event_loop(remaining)
+
+    return chart
+
+
+# Checks a number given on the command line is positive.
+def _positive(kind):
+    def parse(text):
+        value = kind(text)
+        if value <= 0:
+            raise argparse.ArgumentTypeError(f"must be greater than 0, got {text}")
+        return value
+    return parse
+
+
+# Reads the command line options.
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Watch live stock prices update in place.")
+    parser.add_argument("tickers", nargs="*", default=["AAPL", "AMZN", "GOOG", "NVDA"],
+                        help="tickers to watch (default: AAPL AMZN GOOG NVDA)")
+    parser.add_argument("--interval", type=_positive(float), default=DEFAULT_INTERVAL,
+                        help=f"seconds between polls (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument("--capacity", type=_positive(int), default=DEFAULT_CAPACITY,
+                        help=f"newest points shown per ticker (default: {DEFAULT_CAPACITY})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    run_live_chart(args.tickers, interval=args.interval, capacity=args.capacity)
+
+
+if __name__ == "__main__":
+    main()
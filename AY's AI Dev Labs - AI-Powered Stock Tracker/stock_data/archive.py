@@ -0,0 +1,192 @@
+# This module stores years of daily OHLCV bars in an append-only, memory-mapped
+# archive.
+#
+# Every ticker gets its own folder holding one flat binary file per column:
+#   <ARCHIVE>/<TICKER>/date.i8     days since 1970-01-01 (int64, sorted)
+#   <ARCHIVE>/<TICKER>/open.f8     float64, one value per date
+#   ... high.f8, low.f8, close.f8, volume.f8
+# All files use fixed-width rows, so row i of every column belongs to date i.
+# Files are opened with numpy.memmap: opening is instant and reading a date
+# range only touches the pages that hold those rows. The date column can be
+# viewed as datetime64[D] without any conversion.
+#
+# New bars are only ever appended. The value columns are written first and the
+# date column last, so the length of date.i8 is always the number of complete
+# rows; any extra bytes left in other columns by an interrupted write are cut
+# off on the next append.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from stock_data.sources import BAR_COLUMNS, PriceSource
+
+
+# Names of the stored value columns (the date column is stored separately)
+COLUMNS = tuple(name.lower() for name in BAR_COLUMNS)
+
+ROW_BYTES = 8  # every column stores 8-byte values
+
+
+class PriceArchive:
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.mapped = {}  # (ticker, column) -> open memmap
+
+    def _path(self, ticker: str, column: str) -> str:
+        suffix = "i8" if column == "date" else "f8"
+        return os.path.join(self.folder, ticker, f"{column}.{suffix}")
+
+    # Returns the tickers stored in the archive.
+    def tickers(self) -> list[str]:
+        if not os.path.isdir(self.folder):
+            return []
+        return sorted(name for name in os.listdir(self.folder)
+                      if os.path.exists(self._path(name, "date")))
+
+    # Returns the number of complete rows stored for a ticker.
+    def row_count(self, ticker: str) -> int:
+        path = self._path(ticker, "date")
+        return os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+
+    # Returns a read-only memmap of one column ("date" or one of COLUMNS).
+    # Dates come back as datetime64[D]. Nothing is read until it is sliced.
+    def column(self, ticker: str, column: str) -> np.ndarray:
+        if column != "date" and column not in COLUMNS:
+            raise ValueError(f"Unknown column '{column}'. Choose from: date, {', '.join(COLUMNS)}")
+
+        count = self.row_count(ticker)
+        key = (ticker, column)
+        mapped = self.mapped.get(key)
+        if mapped is None or len(mapped) != count:
+            if count == 0:
+                mapped = np.empty(0, dtype=np.int64 if column == "date" else np.float64)
+            else:
+                mapped = np.memmap(self._path(ticker, column), mode="r",
+                                   dtype=np.int64 if column == "date" else np.float64, shape=(count,))
+            self.mapped[key] = mapped
+        return mapped.view("datetime64[D]") if column == "date" else mapped
+
+    # Returns the last stored date of a ticker, or None if it has no rows.
+    def last_date(self, ticker: str):
+        count = self.row_count(ticker)
+        return self.column(ticker, "date")[count - 1] if count else None
+
+    # Returns the row range [first, last) of the dates in [start, end).
+    # Only the pages the binary search lands on are read.
+    def _row_range(self, ticker: str, start, end) -> tuple[int, int]:
+        dates = self.column(ticker, "date")
+        first = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        last = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, "D"), side="left"))
+        return first, max(first, last)
+
+    # Returns {"date": ..., column: ...} for the rows with dates in [start, end).
+    # The arrays are views into the memory-mapped files, so nothing is copied.
+    #
+    # Parameters:
+    # - ticker: The stock ticker.
+    # - start: First date wanted (inclusive), or None for the first stored date.
+    # - end: Last date wanted (exclusive), or None for everything after start.
+    # - columns: Which of COLUMNS to return.
+    #
+    def slice(self, ticker: str, start=None, end=None, columns=("close",)) -> dict:
+        first, last = self._row_range(ticker, start, end)
+        result = {"date": self.column(ticker, "date")[first:last]}
+        for column in columns:
+            result[column] = self.column(ticker, column)[first:last]
+        return result
+
+    # Returns the closes for [start, end) as a pandas Series indexed by date.
+    def closes(self, ticker: str, start=None, end=None) -> pd.Series:
+        rows = self.slice(ticker, start, end)
+        return pd.Series(rows["close"], index=pd.DatetimeIndex(rows["date"]), name="Close", copy=False)
+
+    # Appends daily bars for a ticker. Bars on or before the last stored date
+    # are skipped, so the same download can safely be appended twice.
+    #
+    # Parameters:
+    # - ticker: The stock ticker.
+    # - bars: DataFrame indexed by date with Open/High/Low/Close/Volume columns
+    #   (any capitalisation).
+    #
+    # Returns the number of rows added.
+    #
+    def append(self, ticker: str, bars: pd.DataFrame) -> int:
+        if bars is None or bars.empty:
+            return 0
+        bars = bars.rename(columns=str.lower).sort_index()
+        days = bars.index.to_numpy().astype("datetime64[D]")
+
+        last = self.last_date(ticker)
+        keep = np.ones(len(days), dtype=bool) if last is None else days > last
+        keep[1:] &= days[1:] != days[:-1]  # drop repeated dates
+        if not keep.any():
+            return 0
+
+        os.makedirs(os.path.join(self.folder, ticker), exist_ok=True)
+        count = self.row_count(ticker)
+        self._release(ticker)
+
+        # Value columns first, cut back to the committed row count in case an
+        # earlier append was interrupted
+        for column in COLUMNS:
+            values = bars[column].to_numpy(dtype=np.float64)[keep] if column in bars else np.full(keep.sum(), np.nan)
+            with open(self._path(ticker, column), "ab") as f:
+                f.truncate(count * ROW_BYTES)
+                f.write(values.astype("<f8").tobytes())
+
+        # The date column last: once it's written, the new rows count
+        with open(self._path(ticker, "date"), "ab") as f:
+            f.truncate(count * ROW_BYTES)
+            f.write(days[keep].astype("<i8").tobytes())
+        return int(keep.sum())
+
+    # Drops the open memmaps of a ticker (needed before its files are changed).
+    def _release(self, ticker: str) -> None:
+        for key in [key for key in self.mapped if key[0] == ticker]:
+            del self.mapped[key]
+
+
+# Downloads whatever is missing from the archive for each ticker and appends it.
+#
+# Parameters:
+# - archive: The PriceArchive to fill.
+# - tickers: Tickers to update.
+# - end: Last date wanted (exclusive), usually today.
+# - first_date: Where to start for tickers that aren't in the archive yet.
+# - source: PriceSource that provides get_daily_bars (Yahoo Finance if None).
+#
+# Returns a dict of ticker -> number of rows added.
+#
+def update_archive(archive: PriceArchive, tickers: list[str], end, first_date="2000-01-01",
+                   source: PriceSource = None) -> dict[str, int]:
+    if source is None:
+        from stock_data.sources import YFinanceSource
+
+        source = YFinanceSource()
+
+    added = {}
+    for ticker in tickers:
+        last = archive.last_date(ticker)
+        start = pd.Timestamp(first_date).date() if last is None else (last + np.timedelta64(1, "D")).astype(object)
+        if start >= pd.Timestamp(end).date():
+            added[ticker] = 0
+            continue
+        added[ticker] = archive.append(ticker, source.get_daily_bars(ticker, start, end))
+    return added
+
+
+# Archive Source
+#
+# A PriceSource that reads daily closes out of a PriceArchive, so the rest of
+# the tracker can run straight off the archive.
+class ArchiveSource(PriceSource):
+    # The archive is already on disk, so there is no point copying it into the cache
+    cacheable = False
+
+    def __init__(self, folder: str):
+        self.archive = PriceArchive(folder)
+
+    def get_daily_closes(self, ticker: str, start, end) -> pd.Series:
+        return self.archive.closes(ticker, start, end)
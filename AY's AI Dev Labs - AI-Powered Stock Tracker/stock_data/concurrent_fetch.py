@@ -0,0 +1,102 @@
+# This module runs many fetches at once on a bounded thread pool.
+#
+# Every key (usually a ticker) gets its own time budget, failed attempts are
+# retried with exponential backoff, and whatever finished in time is returned
+# even if some keys failed. The total wait is therefore set by the slowest
+# key instead of the sum of all of them.
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# Defaults for fetch_all
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 30.0  # seconds per key, retries included
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5   # seconds before the first retry, doubled after each one
+
+
+# Calls fetch_one(key) and retries it with exponential backoff if it raises.
+def _fetch_with_retries(key, fetch_one, retries: int, backoff: float, started: dict):
+    started[key] = time.monotonic()
+    for attempt in range(retries + 1):
+        try:
+            return fetch_one(key)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+
+
+# Fetches every key concurrently and returns the partial results.
+#
+# Parameters:
+# - keys: The keys to fetch (e.g. a list of tickers).
+# - fetch_one: Function taking one key and returning its result. It should
+#   raise an exception for a failed fetch so that it gets retried.
+# - max_workers: Maximum number of fetches running at the same time.
+# - timeout: Seconds a key may take from its first attempt until it gives up,
+#   retries and backoff included.
+# - retries: How many times a failed fetch is tried again.
+# - backoff: Seconds to wait before the first retry (doubled each time).
+# - on_done: Optional function called as on_done(key, result, error) when a key
+#   finishes, where exactly one of result and error is None.
+#
+# Returns (results, errors): a dict of key -> result for the keys that
+# succeeded and a dict of key -> exception for the ones that failed.
+#
+# A key that times out is abandoned rather than killed: Python threads can't
+# be stopped, so its worker stays busy until the underlying call returns.
+#
+def fetch_all(keys, fetch_one, max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT,
+              retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF, on_done=None):
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    keys = list(dict.fromkeys(keys))
+    results = {}
+    errors = {}
+    if not keys:
+        return results, errors
+
+    started = {}  # key -> time its first attempt started
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(keys)))
+    futures = {executor.submit(_fetch_with_retries, key, fetch_one, retries, backoff, started): key
+               for key in keys}
+    pending = set(futures)
+
+    def finish(key, result, error):
+        if error is None:
+            results[key] = result
+        else:
+            errors[key] = error
+        if on_done is not None:
+            on_done(key, result, error)
+
+    try:
+        while pending:
+            # Give up on any key that has used up its time budget
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                if key in started and not future.done() and now - started[key] >= timeout:
+                    pending.remove(future)
+                    future.cancel()
+                    finish(key, None, TimeoutError(f"Fetching {key} took longer than {timeout} seconds"))
+            if not pending:
+                break
+
+            # Sleep until something finishes or the next deadline is reached
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait_time = max(0.0, min(deadlines) - now) if deadlines else 0.05
+            done, _ = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pending.remove(future)
+                error = future.exception()
+                finish(futures[future], None if error else future.result(), error)
+    finally:
+        # Don't wait for abandoned (timed out) fetches
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, errors
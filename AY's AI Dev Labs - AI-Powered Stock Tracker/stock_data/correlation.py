@@ -0,0 +1,129 @@
+# This module compares every ticker of a watchlist with every other one:
+# daily returns, pairwise correlations and covariances, and drawdowns.
+#
+# All series are first lined up on one common trading calendar (a 2-D array
+# with one row per date and one column per ticker). The pairwise statistics
+# are then a handful of matrix products instead of a loop over N² pairs.
+# Missing values are handled pairwise: each pair only uses the dates where
+# both tickers have a return.
+#
+# When the N x N result is too big for memory, it can be computed in square
+# blocks and written to a .npy file on disk.
+
+import numpy as np
+import pandas as pd
+
+
+# Lines up several price series on the union of their dates.
+#
+# Parameters:
+# - closes: Dict of ticker -> Series of prices indexed by date.
+# - fill_gaps: Carry the last price forward over dates a ticker didn't trade
+#   (before its first price it stays NaN).
+#
+# Returns (tickers, dates, prices) where prices has one row per date and one
+# column per ticker.
+#
+def align_closes(closes: dict, fill_gaps: bool = True):
+    tickers = [ticker for ticker, series in closes.items() if len(series)]
+    if not tickers:
+        return [], np.empty(0, dtype="datetime64[D]"), np.empty((0, 0))
+
+    frame = pd.concat([closes[ticker].rename(ticker) for ticker in tickers], axis=1, sort=True)
+    if fill_gaps:
+        frame = frame.ffill()
+    return tickers, frame.index.to_numpy().astype("datetime64[D]"), frame.to_numpy(dtype=np.float64)
+
+
+# Returns the period-to-period returns of aligned prices (one row fewer than prices).
+# log=True gives log returns instead of simple returns.
+def returns_matrix(prices: np.ndarray, log: bool = False) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if log:
+            return np.diff(np.log(prices), axis=0)
+        return prices[1:] / prices[:-1] - 1.0
+
+
+# Computes one block of the pairwise statistic between columns a and columns b.
+#
+# a, b: returns with NaN replaced by 0. a_valid, b_valid: 1.0 where there was a return.
+def _pairwise_block(a, a_valid, b, b_valid, kind: str, min_periods: int) -> np.ndarray:
+    n = a_valid.T @ b_valid        # dates where both have a return
+    sum_ab = a.T @ b
+    sum_a = a.T @ b_valid          # sum of a over dates where b is valid too
+    sum_b = a_valid.T @ b
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "covariance":
+            result = (sum_ab - sum_a * sum_b / n) / (n - 1)
+        else:
+            sum_aa = (a * a).T @ b_valid
+            sum_bb = a_valid.T @ (b * b)
+            result = (n * sum_ab - sum_a * sum_b) / np.sqrt((n * sum_aa - sum_a ** 2) * (n * sum_bb - sum_b ** 2))
+            result = np.clip(result, -1.0, 1.0)
+    return np.where(n >= min_periods, result, np.nan)
+
+
+# Computes the N x N pairwise matrix of a statistic over the columns of returns.
+def _pairwise(returns: np.ndarray, kind: str, min_periods: int, block_size: int, out_path: str) -> np.ndarray:
+    returns = np.asarray(returns, dtype=np.float64)
+    valid = (~np.isnan(returns)).astype(np.float64)
+    filled = np.where(valid > 0, returns, 0.0)
+    count = returns.shape[1]
+
+    if out_path is not None:
+        result = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float64, shape=(count, count))
+    else:
+        result = np.empty((count, count))
+
+    block_size = block_size or count or 1
+    for i in range(0, count, block_size):
+        rows = slice(i, i + block_size)
+        # The matrix is symmetric, so only blocks on or above the diagonal are computed
+        for j in range(i, count, block_size):
+            columns = slice(j, j + block_size)
+            block = _pairwise_block(filled[:, rows], valid[:, rows], filled[:, columns], valid[:, columns],
+                                    kind, min_periods)
+            result[rows, columns] = block
+            result[columns, rows] = block.T
+
+    if out_path is not None:
+        result.flush()
+    return result
+
+
+# Pairwise correlation of every ticker with every other.
+#
+# Parameters:
+# - returns: 2-D array, one row per date and one column per ticker (NaN = missing).
+# - min_periods: Pairs with fewer shared dates than this get NaN.
+# - block_size: Compute the matrix in blocks of this many tickers to limit memory.
+# - out_path: Optional .npy file to write the result to (returned as a memmap),
+#   for matrices too big to keep in memory.
+#
+def correlation_matrix(returns: np.ndarray, min_periods: int = 20, block_size: int = None,
+                       out_path: str = None) -> np.ndarray:
+    return _pairwise(returns, "correlation", min_periods, block_size, out_path)
+
+
+# Pairwise covariance of every ticker with every other (same parameters as correlation_matrix).
+def covariance_matrix(returns: np.ndarray, min_periods: int = 20, block_size: int = None,
+                      out_path: str = None) -> np.ndarray:
+    return _pairwise(returns, "covariance", min_periods, block_size, out_path)
+
+
+# Returns the drawdown of every ticker at every date: how far (as a fraction,
+# 0 to -1) the price sits below its highest price so far.
+def drawdowns(prices: np.ndarray) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    running_max = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return prices / running_max - 1.0
+
+
+# Returns the worst drawdown of every ticker (a negative fraction, NaN if no data).
+def max_drawdowns(prices: np.ndarray) -> np.ndarray:
+    values = drawdowns(prices)
+    worst = np.where(np.isnan(values), np.inf, values).min(axis=0)
+    return np.where(np.isinf(worst), np.nan, worst)
@@ -0,0 +1,157 @@
+# This module predicts future prices for a whole watchlist at once.
+#
+# Every model takes a 2-D array of prices (one row per ticker, oldest to
+# newest, NaN for missing points) and returns a 2-D array of forecasts (one
+# row per ticker, one column per future step). The models only loop over
+# time; each step updates every ticker together with NumPy, so scoring a
+# thousand tickers costs about the same as scoring one.
+
+import numpy as np
+
+
+# Supported model names for forecast()
+MODELS = ("linear", "smoothing", "holt_winters")
+
+
+# Shifts every row to the right so its last valid price sits in the last column.
+#
+# PriceTable pads short rows at the end, but the models need all rows to end
+# at "now". Rows are padded at the front with NaN instead.
+#
+# Parameters:
+# - prices: 2-D array, one row per ticker.
+# - counts: Optional number of valid points per row (PriceTable.counts). When
+#   not given, everything up to the last non-NaN value of a row counts.
+#
+def right_align(prices: np.ndarray, counts: np.ndarray = None) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    rows, width = prices.shape
+    if counts is None:
+        has_value = ~np.isnan(prices)
+        counts = np.where(has_value.any(axis=1), width - np.argmax(has_value[:, ::-1], axis=1), 0)
+
+    source_column = np.arange(width)[None, :] - (width - np.asarray(counts))[:, None]
+    valid = source_column >= 0
+    aligned = np.take_along_axis(prices, np.maximum(source_column, 0), axis=1)
+    return np.where(valid, aligned, np.nan)
+
+
+# Rolling linear regression: fits a straight line to the last "window" prices of
+# every ticker and extends it "horizon" steps into the future.
+def linear_trend(prices: np.ndarray, horizon: int, window: int = 12) -> np.ndarray:
+    recent = np.asarray(prices, dtype=np.float64)[:, -window:]
+    x = np.arange(recent.shape[1], dtype=np.float64)
+
+    # Least squares on the valid points of each row, all rows at once
+    valid = ~np.isnan(recent)
+    n = valid.sum(axis=1)
+    y = np.where(valid, recent, 0.0)
+    xs = np.where(valid, x, 0.0)
+    sum_x, sum_y = xs.sum(axis=1), y.sum(axis=1)
+    sum_xx, sum_xy = (xs * xs).sum(axis=1), (xs * y).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denominator = n * sum_xx - sum_x * sum_x
+        slope = np.where(denominator != 0, (n * sum_xy - sum_x * sum_y) / denominator, 0.0)
+        intercept = (sum_y - slope * sum_x) / n  # NaN for rows with no data
+
+    future_x = x[-1] + np.arange(1, horizon + 1, dtype=np.float64) if len(x) else np.arange(horizon, dtype=np.float64)
+    return intercept[:, None] + slope[:, None] * future_x[None, :]
+
+
+# Simple exponential smoothing: every forecast step is the smoothed level.
+def exponential_smoothing(prices: np.ndarray, horizon: int, alpha: float = 0.5) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    level = np.full(prices.shape[0], np.nan)
+
+    for t in range(prices.shape[1]):
+        y = prices[:, t]
+        has_value = ~np.isnan(y)
+        starting = has_value & np.isnan(level)
+        level = np.where(starting, y, level)
+        level = np.where(has_value & ~starting, alpha * y + (1 - alpha) * level, level)
+
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+# Additive Holt-Winters: smoothed level, trend and (optionally) season.
+#
+# Parameters:
+# - prices: 2-D array, one row per ticker, right-aligned (see right_align).
+# - horizon: Number of future steps to forecast.
+# - alpha, beta, gamma: Smoothing factors (0-1) for the level, trend and season.
+# - season_length: Number of steps in one season (e.g. 12 for monthly data with
+#   a yearly pattern). None or anything below 2 turns the season off, which
+#   gives Holt's linear trend method.
+#
+def holt_winters(prices: np.ndarray, horizon: int, alpha: float = 0.5, beta: float = 0.3, gamma: float = 0.1,
+                 season_length: int = None) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    rows, width = prices.shape
+    seasons = season_length if season_length and season_length > 1 else 1
+
+    level = np.full(rows, np.nan)
+    trend = np.zeros(rows)
+    season = np.zeros((rows, seasons))
+
+    for t in range(width):
+        y = prices[:, t]
+        has_value = ~np.isnan(y)
+        starting = has_value & np.isnan(level)
+        updating = has_value & ~starting
+        level = np.where(starting, y, level)
+
+        s = season[:, t % seasons] if seasons > 1 else 0.0
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+
+        trend = np.where(updating, new_trend, trend)
+        if seasons > 1:
+            season[:, t % seasons] = np.where(updating, gamma * (y - new_level) + (1 - gamma) * s, s)
+        level = np.where(updating, new_level, level)
+
+    steps = np.arange(1, horizon + 1)
+    forecast = level[:, None] + trend[:, None] * steps[None, :]
+    if seasons > 1:
+        forecast += season[:, (width - 1 + steps) % seasons]
+    return forecast
+
+
+# Forecasts every row of prices with the chosen model.
+#
+# Parameters:
+# - prices: 2-D array, one row per ticker. Rows are right-aligned first.
+# - horizon: Number of future steps to forecast.
+# - model: "linear", "smoothing" or "holt_winters".
+# - counts: Optional valid points per row (PriceTable.counts).
+# - **params: Extra settings for the model (e.g. window, alpha, season_length).
+#
+def forecast(prices: np.ndarray, horizon: int, model: str = "holt_winters", counts: np.ndarray = None,
+             **params) -> np.ndarray:
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}'. Choose from: {', '.join(MODELS)}")
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+
+    aligned = right_align(prices, counts)
+    if model == "linear":
+        return linear_trend(aligned, horizon, **params)
+    if model == "smoothing":
+        return exponential_smoothing(aligned, horizon, **params)
+    return holt_winters(aligned, horizon, **params)
+
+
+# Scores a model on every ticker by hiding the last "holdout" prices,
+# forecasting them, and comparing the forecast with what really happened.
+#
+# Returns the mean absolute percentage error of each row (NaN where a row has
+# too little data).
+#
+def backtest_error(prices: np.ndarray, holdout: int, model: str = "holt_winters", counts: np.ndarray = None,
+                   **params) -> np.ndarray:
+    aligned = right_align(prices, counts)
+    history, actual = aligned[:, :-holdout], aligned[:, -holdout:]
+    predicted = forecast(history, holdout, model, **params)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nanmean(np.abs(predicted - actual) / np.abs(actual), axis=1)
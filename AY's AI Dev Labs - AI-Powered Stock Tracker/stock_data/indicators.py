@@ -0,0 +1,253 @@
+# This module computes technical indicators incrementally.
+#
+# Each indicator object tracks a whole watchlist: its state is a handful of
+# NumPy arrays with one entry (or one small window) per ticker. update() takes
+# the newest bar of every ticker and returns the new indicator values in O(1)
+# work per ticker, so a refresh never has to go back over years of history.
+# A NaN in the new bar means "no new bar for this ticker" and leaves its
+# state untouched.
+#
+# run() feeds a whole 2-D history (one row per ticker) through update(), which
+# is how the state is warmed up the first time. IndicatorSet.extend() takes
+# dated bars and only feeds it the days after the last one it has seen, and
+# its state can be saved between runs, so a refresh only does the new days
+# (see stock_nums.update_indicators).
+
+import pickle
+
+import numpy as np
+
+
+# Fixed-size window of the last "period" values of every ticker, with running
+# sums so the mean and standard deviation are O(1) to update.
+class RollingWindow:
+    def __init__(self, tickers: int, period: int):
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self.period = period
+        self.values = np.zeros((tickers, period))
+        self.position = np.zeros(tickers, dtype=np.int64)  # where each ticker's next value goes
+        self.count = np.zeros(tickers, dtype=np.int64)     # values stored so far (up to period)
+        self.sum = np.zeros(tickers)
+        self.sum_sq = np.zeros(tickers)
+        self.pushes = 0
+
+    # Adds one value per ticker (NaN = skip that ticker).
+    def push(self, new_values: np.ndarray) -> None:
+        rows = np.flatnonzero(~np.isnan(new_values))
+        columns = self.position[rows]
+        old = self.values[rows, columns]
+        new = new_values[rows]
+
+        self.sum[rows] += new - old
+        self.sum_sq[rows] += new * new - old * old
+        self.values[rows, columns] = new
+        self.position[rows] = (columns + 1) % self.period
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.period)
+
+        # Running sums slowly drift through rounding, so rebuild them from the
+        # window now and then (once per period, so still O(1) on average)
+        self.pushes += 1
+        if self.pushes % self.period == 0:
+            self.sum = self.values.sum(axis=1)
+            self.sum_sq = (self.values * self.values).sum(axis=1)
+
+    def is_full(self) -> np.ndarray:
+        return self.count == self.period
+
+    # Mean of each full window (NaN until the window has filled up).
+    def mean(self) -> np.ndarray:
+        return np.where(self.is_full(), self.sum / self.period, np.nan)
+
+    # Population standard deviation of each full window (NaN until full).
+    def std(self) -> np.ndarray:
+        mean = self.sum / self.period
+        variance = np.maximum(self.sum_sq / self.period - mean * mean, 0.0)
+        return np.where(self.is_full(), np.sqrt(variance), np.nan)
+
+
+# Base Indicator Class
+class Indicator:
+    # Takes the newest bar of every ticker and returns the updated indicator value(s).
+    def update(self, bar: np.ndarray):
+        raise NotImplementedError
+
+    # Feeds a whole history through update(), oldest bar first.
+    #
+    # Parameters:
+    # - prices: 2-D array, one row per ticker and one column per bar.
+    #
+    # Returns an array shaped like prices (or a tuple of them for indicators
+    # with several outputs) holding the indicator value after every bar.
+    def run(self, prices: np.ndarray):
+        prices = np.asarray(prices, dtype=np.float64)
+        steps = [self.update(prices[:, t]) for t in range(prices.shape[1])]
+        if steps and isinstance(steps[0], tuple):
+            return tuple(np.stack(parts, axis=1) for parts in zip(*steps))
+        return np.stack(steps, axis=1) if steps else np.empty_like(prices)
+
+
+# Simple Moving Average
+class SMA(Indicator):
+    def __init__(self, tickers: int, period: int = 20):
+        self.window = RollingWindow(tickers, period)
+
+    def update(self, bar: np.ndarray) -> np.ndarray:
+        self.window.push(np.asarray(bar, dtype=np.float64))
+        return self.window.mean()
+
+
+# Exponential Moving Average, seeded with each ticker's first price
+class EMA(Indicator):
+    def __init__(self, tickers: int, period: int = 20):
+        self.alpha = 2.0 / (period + 1)
+        self.value = np.full(tickers, np.nan)
+
+    def update(self, bar: np.ndarray) -> np.ndarray:
+        bar = np.asarray(bar, dtype=np.float64)
+        has_bar = ~np.isnan(bar)
+        starting = has_bar & np.isnan(self.value)
+        self.value = np.where(starting, bar, self.value)
+        self.value = np.where(has_bar & ~starting, self.value + self.alpha * (bar - self.value), self.value)
+        return self.value.copy()
+
+
+# Relative Strength Index with Wilder's smoothing
+class RSI(Indicator):
+    def __init__(self, tickers: int, period: int = 14):
+        self.period = period
+        self.previous = np.full(tickers, np.nan)
+        self.average_gain = np.zeros(tickers)
+        self.average_loss = np.zeros(tickers)
+        self.changes = np.zeros(tickers, dtype=np.int64)
+
+    def update(self, bar: np.ndarray) -> np.ndarray:
+        bar = np.asarray(bar, dtype=np.float64)
+        moving = ~np.isnan(bar) & ~np.isnan(self.previous)
+        change = np.where(moving, bar - self.previous, 0.0)
+        gain, loss = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+        # Plain average for the first "period" changes, then Wilder's smoothing
+        self.changes += moving
+        weight = np.where(self.changes <= self.period, 1.0 / np.maximum(self.changes, 1), 1.0 / self.period)
+        self.average_gain = np.where(moving, self.average_gain + weight * (gain - self.average_gain), self.average_gain)
+        self.average_loss = np.where(moving, self.average_loss + weight * (loss - self.average_loss), self.average_loss)
+        self.previous = np.where(np.isnan(bar), self.previous, bar)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + self.average_gain / self.average_loss)
+        rsi = np.where(self.average_loss == 0, np.where(self.average_gain == 0, 50.0, 100.0), rsi)
+        return np.where(self.changes >= self.period, rsi, np.nan)
+
+
+# Moving Average Convergence/Divergence.
+# update() returns (macd, signal, histogram).
+class MACD(Indicator):
+    def __init__(self, tickers: int, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(tickers, fast)
+        self.slow = EMA(tickers, slow)
+        self.signal = EMA(tickers, signal)
+
+    def update(self, bar: np.ndarray):
+        macd = self.fast.update(bar) - self.slow.update(bar)
+        has_bar = ~np.isnan(np.asarray(bar, dtype=np.float64))
+        signal = self.signal.update(np.where(has_bar, macd, np.nan))
+        return macd, signal, macd - signal
+
+
+# Bollinger Bands.
+# update() returns (lower, middle, upper).
+class BollingerBands(Indicator):
+    def __init__(self, tickers: int, period: int = 20, width: float = 2.0):
+        self.window = RollingWindow(tickers, period)
+        self.width = width
+
+    def update(self, bar: np.ndarray):
+        self.window.push(np.asarray(bar, dtype=np.float64))
+        middle, std = self.window.mean(), self.window.std()
+        return middle - self.width * std, middle, middle + self.width * std
+
+
+# Rolling volatility: standard deviation of log returns over the last "period"
+# bars, scaled to a yearly figure with annualize (252 trading days by default).
+class Volatility(Indicator):
+    def __init__(self, tickers: int, period: int = 20, annualize: float = 252.0):
+        self.window = RollingWindow(tickers, period)
+        self.previous = np.full(tickers, np.nan)
+        self.scale = np.sqrt(annualize) if annualize else 1.0
+
+    def update(self, bar: np.ndarray) -> np.ndarray:
+        bar = np.asarray(bar, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_return = np.log(bar / self.previous)
+        self.window.push(log_return)
+        self.previous = np.where(np.isnan(bar), self.previous, bar)
+        return self.window.std() * self.scale
+
+
+# Keeps several named indicators for the same watchlist and updates them together.
+#
+# Example:
+#   indicators = IndicatorSet(len(tickers), sma=SMA(len(tickers), 50), rsi=RSI(len(tickers)))
+#   history = indicators.run(daily_prices)      # warm up once
+#   latest = indicators.update(todays_closes)   # then O(1) per new bar
+#
+class IndicatorSet:
+    def __init__(self, tickers: int, **indicators):
+        self.tickers = tickers
+        self.indicators = indicators
+        self.names = None      # the tickers of the columns, when known
+        self.last_date = None  # date of the newest bar fed in by extend()
+        self.latest = {}       # name -> value(s) after that bar
+
+    # Feeds in the bars dated after last_date, oldest first.
+    #
+    # Parameters:
+    # - dates: datetime64 dates of the bars, ascending.
+    # - prices: 2-D array, one row per date and one column per ticker (NaN = no bar).
+    #
+    # Returns the latest dict of name -> value(s), one value per ticker.
+    #
+    def extend(self, dates: np.ndarray, prices: np.ndarray) -> dict:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.ndim != 2 or prices.shape[1] != self.tickers:
+            raise ValueError(f"Expected prices with {self.tickers} columns, got shape {prices.shape}")
+
+        new = np.ones(len(dates), dtype=bool) if self.last_date is None else dates > self.last_date
+        for bar in prices[new]:
+            self.latest = self.update(bar)
+        if new.any():
+            self.last_date = dates[new][-1]
+        return self.latest
+
+    # Writes the whole state to a file, so a later run can carry on from it.
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    # Reads a state written by save(). Only load files this program wrote:
+    # unpickling can run code.
+    @staticmethod
+    def load(path: str) -> "IndicatorSet":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    # Updates every indicator with the newest bar; returns a dict of name -> value(s).
+    def update(self, bar: np.ndarray) -> dict:
+        return {name: indicator.update(bar) for name, indicator in self.indicators.items()}
+
+    # Runs every indicator over a whole history; returns a dict of name -> result.
+    def run(self, prices: np.ndarray) -> dict:
+        return {name: indicator.run(prices) for name, indicator in self.indicators.items()}
+
+
+# Returns an IndicatorSet for a list of tickers with every indicator at its
+# usual settings: "sma" and "ema" (20 days), "rsi" (14), "macd" (12/26/9),
+# "bollinger" (20 days, 2 deviations) and "volatility" (20 days, annualized).
+def default_indicators(tickers: list[str]) -> IndicatorSet:
+    count = len(tickers)
+    indicators = IndicatorSet(count, sma=SMA(count), ema=EMA(count), rsi=RSI(count), macd=MACD(count),
+                              bollinger=BollingerBands(count), volatility=Volatility(count))
+    indicators.names = list(tickers)
+    return indicators
@@ -0,0 +1,164 @@
+# This module collects timings and counters for each stage of the pipeline
+# (fetch, resample, convert, render), so a slow refresh can be pinned on the
+# network, pandas or matplotlib.
+#
+# Code records into the shared METRICS object:
+#   with stock_data.metrics.timer("fetch"):
+#       ...
+#   stock_data.metrics.count("cache_hits")
+#
+# At the end of a run the totals are handed to one or more sinks: a JSON log
+# that gets one line per run (stage_percentiles() reads it back to give
+# latency percentiles across runs) or a Prometheus text file for the node
+# exporter's textfile collector.
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Prefix of every metric name written to Prometheus
+PROMETHEUS_PREFIX = "stock_tracker"
+
+
+# Thread-safe store of stage timings and counters.
+# Fetches run on a thread pool, so every update takes the lock.
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}  # name -> total
+        self.timings = {}   # stage -> list of durations in seconds
+
+    # Adds amount to a counter (e.g. "rows_fetched" or "cache_hits").
+    def count(self, name: str, amount=1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Records how long a stage took.
+    def add_timing(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.timings.setdefault(stage, []).append(seconds)
+
+    # Times the body of a with block as one run of a stage.
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(stage, time.perf_counter() - start)
+
+    # Returns the metrics recorded so far as a plain dict:
+    # {"timestamp", "counters": {name: total}, "stages": {stage: {"count", "seconds", "max_seconds"}}}
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {stage: {"count": len(durations), "seconds": sum(durations), "max_seconds": max(durations)}
+                      for stage, durations in self.timings.items()}
+            return {"timestamp": time.time(), "counters": dict(self.counters), "stages": stages}
+
+    # Forgets everything recorded so far.
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    # Sends a snapshot to every sink.
+    def flush(self, sinks) -> None:
+        snapshot = self.snapshot()
+        for sink in sinks:
+            sink.emit(snapshot)
+
+
+# The metrics shared by the whole program
+METRICS = Metrics()
+
+
+# Shortcuts for recording into METRICS
+def count(name: str, amount=1) -> None:
+    METRICS.count(name, amount)
+
+
+def timer(stage: str):
+    return METRICS.timer(stage)
+
+
+# Base Metrics Sink Class
+class MetricsSink:
+    # Writes out one snapshot (see Metrics.snapshot).
+    def emit(self, snapshot: dict) -> None:
+        raise NotImplementedError
+
+
+# JSON Log Sink
+#
+# Appends each snapshot as a single JSON line to a log file ("-" for stderr).
+class JsonLogSink(MetricsSink):
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, snapshot: dict) -> None:
+        line = json.dumps(snapshot, sort_keys=True)
+        if self.path == "-":
+            print(line, file=sys.stderr)
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# Prometheus Text File Sink
+#
+# Rewrites a file in the Prometheus text format with the latest run's numbers.
+# Counters become "stock_tracker_<name>" gauges, and each stage gets
+# "stock_tracker_stage_seconds" (total time), "..._max" and "..._count" series.
+# The file is written next to its final name and then renamed, so a scrape
+# never sees it half written.
+class PrometheusFileSink(MetricsSink):
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, snapshot: dict) -> None:
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+
+        stage_metric = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        if snapshot["stages"]:
+            lines += [f"# TYPE {stage_metric} gauge", f"# TYPE {stage_metric}_max gauge",
+                      f"# TYPE {stage_metric}_count gauge"]
+        for stage, stats in sorted(snapshot["stages"].items()):
+            lines += [f'{stage_metric}{{stage="{stage}"}} {stats["seconds"]:.6f}',
+                      f'{stage_metric}_max{{stage="{stage}"}} {stats["max_seconds"]:.6f}',
+                      f'{stage_metric}_count{{stage="{stage}"}} {stats["count"]}']
+        lines.append(f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {snapshot['timestamp']:.3f}")
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.path)
+
+
+# Reads a JSON metrics log and returns the latency percentiles of each stage
+# across all the runs in it.
+#
+# Parameters:
+# - path: A log file written by JsonLogSink.
+# - percentiles: The percentiles wanted, from 0 to 100.
+#
+# Returns {stage: {percentile: seconds}}, using each run's total time per stage.
+#
+def stage_percentiles(path: str, percentiles=(50, 90, 99)) -> dict:
+    import numpy as np
+
+    per_stage = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                for stage, stats in json.loads(line).get("stages", {}).items():
+                    per_stage.setdefault(stage, []).append(stats["seconds"])
+
+    return {stage: dict(zip(percentiles, np.percentile(seconds, percentiles).tolist()))
+            for stage, seconds in per_stage.items()}
@@ -0,0 +1,215 @@
+# This module values a portfolio of holdings over the aligned price history
+# of its tickers (see stock_data.correlation.align_closes): shares held, cost
+# basis, realized and unrealized P&L, daily P&L and time-weighted return.
+#
+# Shares, cost basis and realized P&L only change on days a ticker is traded,
+# so they are worked out on those "trade events" alone (one per ticker and
+# trading day with trades), and then filled forward onto the (dates x tickers)
+# grid of prices. Only the market value (shares * close) is computed for every
+# cell. The only thing that depends on the event before is the cost basis
+# (average cost method), which follows
+#     cost[e] = keep[e] * cost[e-1] + bought_cost[e]
+# where keep is the fraction of shares not sold at that event. That recurrence
+# is solved with a cumulative product, restarted at each ticker's first event
+# and wherever a position is sold out completely.
+#
+# Sales on a day are applied before purchases, so they have to come out of the
+# shares held at the start of that day. Short positions are not supported.
+
+import numpy as np
+import pandas as pd
+
+
+# Columns of a trades file, as read by read_trades
+TRADE_COLUMNS = ("date", "ticker", "quantity", "price")
+
+
+# Reads trades from a CSV file with the columns date, ticker, quantity and
+# (optionally) price. Quantities are positive for buys and negative for sells.
+# A missing price means the trade was made at that day's close.
+def read_trades(path: str) -> pd.DataFrame:
+    trades = pd.read_csv(path, skipinitialspace=True)
+    missing = [column for column in TRADE_COLUMNS[:3] if column not in trades.columns]
+    if missing:
+        raise ValueError(f"Trades file is missing the column(s): {', '.join(missing)}")
+    if "price" not in trades.columns:
+        trades["price"] = np.nan
+    trades["ticker"] = trades["ticker"].str.strip().str.upper()
+    trades["date"] = pd.to_datetime(trades["date"])
+    return trades[list(TRADE_COLUMNS)]
+
+
+# Totals the trades of each ticker on each trading day.
+#
+# Parameters:
+# - trades: DataFrame with the columns of TRADE_COLUMNS.
+# - tickers: The tickers of the price columns.
+# - dates: The trading dates of the price rows (datetime64, ascending).
+# - prices: Aligned prices, one row per date and one column per ticker. Used for
+#   trades without a price.
+#
+# A trade on a day without prices (a weekend, say) counts on the next trading day.
+#
+# Returns (rows, cols, bought, sold, bought_cost, sold_proceeds): one entry per
+# trade event, sorted by ticker column and then by date row.
+#
+def trade_events(trades: pd.DataFrame, tickers: list[str], dates: np.ndarray, prices: np.ndarray):
+    columns = {ticker: i for i, ticker in enumerate(tickers)}
+    unknown = sorted(set(trades["ticker"]) - set(columns))
+    if unknown:
+        raise ValueError(f"No prices for traded ticker(s): {', '.join(unknown)}")
+
+    rows = np.searchsorted(dates, trades["date"].to_numpy().astype(dates.dtype))
+    if len(rows) and rows.max() >= len(dates):
+        raise ValueError("Some trades are dated after the last price.")
+    cols = trades["ticker"].map(columns).to_numpy(dtype=np.int64)
+    quantity = trades["quantity"].to_numpy(dtype=np.float64)
+    price = trades["price"].to_numpy(dtype=np.float64)
+    price = np.where(np.isnan(price), prices[rows, cols], price)
+
+    # One event per (ticker, day), numbered in ticker-then-date order
+    keys, event = np.unique(cols * len(dates) + rows, return_inverse=True)
+    buys = quantity > 0
+
+    def total(values):
+        return np.bincount(event, weights=values, minlength=len(keys))
+
+    return (keys % len(dates), keys // len(dates),
+            total(np.where(buys, quantity, 0.0)), total(np.where(buys, 0.0, -quantity)),
+            total(np.where(buys, quantity * price, 0.0)), total(np.where(buys, 0.0, -quantity * price)))
+
+
+# Spreads trades onto the (dates x tickers) grid of aligned prices.
+# Parameters are as for trade_events.
+#
+# Returns (bought, sold, bought_cost, sold_proceeds), each shaped like prices.
+#
+def trade_arrays(trades: pd.DataFrame, tickers: list[str], dates: np.ndarray, prices: np.ndarray):
+    rows, cols, *totals = trade_events(trades, tickers, dates, prices)
+    grids = []
+    for values in totals:
+        grid = np.zeros(prices.shape)
+        grid[rows, cols] = values
+        grids.append(grid)
+    return tuple(grids)
+
+
+# Solves cost[e] = keep[e] * cost[e-1] + added[e] along a list of events.
+#
+# Within a run of events, cost[e] = growth[e] * sum(added[s] / growth[s]) where
+# growth is the running product of keep since the run began. A new run starts
+# wherever restarts is True (the cost before it is forgotten), so growth never
+# reaches zero. Sums and products are taken per run, so runs don't lose
+# precision to each other.
+def _cost_recurrence(keep: np.ndarray, added: np.ndarray, restarts: np.ndarray) -> np.ndarray:
+    runs = np.cumsum(restarts)
+    growth = pd.Series(np.where(restarts, 1.0, keep)).groupby(runs).cumprod().to_numpy()
+    return pd.Series(added / growth).groupby(runs).cumsum().to_numpy() * growth
+
+
+# Fills per-event values forward onto the (dates x tickers) grid.
+#
+# Every ticker's column is a run of zeros up to its first event followed by one
+# run per event, so the grid is built a ticker at a time with np.repeat (one
+# sequential write), and returned as a transposed view of that ticker-major array.
+class _ForwardFill:
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, shape: tuple[int, int]):
+        days, tickers = shape
+        self.shape = shape
+        # Run starts in the flattened ticker-major grid, the zero run of each ticker first
+        starts = np.concatenate([np.arange(tickers) * days, cols * days + rows])
+        self.order = np.argsort(starts, kind="stable")
+        self.lengths = np.diff(np.append(starts[self.order], days * tickers))
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        days, tickers = self.shape
+        runs = np.concatenate([np.zeros(tickers), values])[self.order]
+        return np.repeat(runs, self.lengths).reshape(tickers, days).T
+
+
+# Portfolio Valuation Class
+#
+# Holds the valuation of every position on every date. All per-position arrays
+# have one row per date and one column per ticker.
+class PortfolioValuation:
+    def __init__(self, tickers, dates, shares, market_value, cost_basis, realized_pnl, net_flows):
+        self.tickers = list(tickers)
+        self.dates = dates
+        self.shares = shares              # shares held at the close
+        self.market_value = market_value  # shares * close
+        self.cost_basis = cost_basis      # what the shares held cost (average cost)
+        self.realized_pnl = realized_pnl  # running total of gains locked in by sales
+        self.net_flows = net_flows        # per date: money put into (+) or taken out of (-) the portfolio
+
+    # Gains on the shares still held.
+    def unrealized_pnl(self) -> np.ndarray:
+        return self.market_value - self.cost_basis
+
+    # Realized plus unrealized P&L of each position, to date.
+    def total_pnl(self) -> np.ndarray:
+        return self.realized_pnl + self.unrealized_pnl()
+
+    # P&L made on each date by each position.
+    def daily_pnl(self) -> np.ndarray:
+        return np.diff(self.total_pnl(), axis=0, prepend=0.0)
+
+    # Value of the whole portfolio on each date.
+    def portfolio_value(self) -> np.ndarray:
+        return self.market_value.sum(axis=1)
+
+    # Time-weighted return of the whole portfolio since the first date, on each
+    # date. Money moved in or out on a day is assumed to move at the close, so
+    # it doesn't count as a gain or loss.
+    def time_weighted_return(self) -> np.ndarray:
+        value = self.portfolio_value()
+        previous = np.concatenate([[0.0], value[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            daily = np.where(previous > 0, (value - self.net_flows) / previous - 1.0, 0.0)
+        return np.cumprod(1.0 + daily) - 1.0
+
+
+# Values every position on every date.
+#
+# Parameters:
+# - tickers, dates, prices: Aligned prices, as from stock_data.correlation.align_closes
+#   (or stock_nums.get_aligned_prices). Gaps should already be filled forward.
+# - trades: DataFrame of trades (see read_trades).
+#
+# Returns a PortfolioValuation.
+#
+def value_portfolio(tickers: list[str], dates: np.ndarray, prices: np.ndarray, trades: pd.DataFrame):
+    prices = np.asarray(prices, dtype=np.float64)
+    rows, cols, bought, sold, bought_cost, sold_proceeds = trade_events(trades, tickers, dates, prices)
+
+    # Running totals per ticker, over its events only
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = cols[1:] != cols[:-1]
+    ticker_events = pd.Series(cols)
+
+    shares = pd.Series(bought - sold).groupby(ticker_events).cumsum().to_numpy()
+    held_before = shares - (bought - sold)
+    if (sold > held_before + 1e-9).any():
+        raise ValueError("Some trades sell more shares than were held at the start of the day "
+                         "(short positions are not supported).")
+
+    # Fraction of the shares held before each event still held after its sales
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keep = np.where(held_before > 0, 1.0 - sold / held_before, 1.0)
+    np.clip(keep, 0.0, 1.0, out=keep)  # rounding only
+
+    cost_basis = _cost_recurrence(keep, bought_cost, first | (keep <= 0))
+
+    # Each sale locks in its proceeds minus the average cost of the shares sold
+    cost_before = np.concatenate([[0.0], cost_basis[:-1]])
+    cost_before[first] = 0.0
+    realized_pnl = pd.Series(sold_proceeds - (1.0 - keep) * cost_before).groupby(ticker_events).cumsum().to_numpy()
+
+    fill_forward = _ForwardFill(rows, cols, prices.shape)
+    shares = fill_forward(shares)
+    market_value = shares * prices
+    missing = np.isnan(prices)
+    if missing.any():
+        market_value[missing & (shares == 0)] = 0.0  # positions not held are worth 0, not NaN
+    net_flows = np.bincount(rows, weights=bought_cost - sold_proceeds, minlength=len(dates))
+    return PortfolioValuation(tickers, dates, shares, market_value, fill_forward(cost_basis),
+                              fill_forward(realized_pnl), net_flows)
@@ -0,0 +1,230 @@
+# This module keeps a local on-disk store of daily closing prices so that
+# repeated runs only ask the provider for the days they have not seen yet.
+#
+# Each ticker gets its own small SQLite file inside CACHE_DIR. The "prices"
+# table holds one row per trading day, and the "meta" table remembers which
+# date range has already been requested from the provider (so weekends and
+# holidays with no rows are not re-requested on every run).
+#
+# Missing days are fetched from a PriceSource (see sources.py). Sources that
+# are already local (such as ReplaySource) skip the cache entirely.
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+
+import pandas as pd
+
+import stock_data.metrics
+from stock_data.sources import PriceSource, default_source
+
+
+# Default folder for the per-ticker cache files
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "price_cache")
+
+# Default number of tickers sent to the provider in one batched request
+DEFAULT_CHUNK_SIZE = 50
+
+
+# Returns the path of the cache file used for a ticker.
+def _cache_path(ticker: str, cache_dir: str) -> str:
+    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker.upper())
+    return os.path.join(cache_dir, f"{safe_name}.sqlite")
+
+
+# Opens (and if needed creates) the cache file for a ticker.
+def _connect(ticker: str, cache_dir: str) -> sqlite3.Connection:
+    os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(_cache_path(ticker, cache_dir))
+    conn.execute("CREATE TABLE IF NOT EXISTS prices (date TEXT PRIMARY KEY, close REAL NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    return conn
+
+
+# Returns the (start, end) date range already fetched for a ticker, or None.
+# The end date is exclusive, the same as yf.download's "end" argument.
+def _read_coverage(conn: sqlite3.Connection):
+    rows = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('start', 'end')").fetchall())
+    if "start" not in rows or "end" not in rows:
+        return None
+    return date.fromisoformat(rows["start"]), date.fromisoformat(rows["end"])
+
+
+# Works out which parts of [start, end) are not yet covered by the cache.
+# The cache only records one covered block, so a request that lies wholly
+# before or after it also fetches the days between it and the block: every
+# download then touches the block's edge, the block never gets unfetched days
+# inside it, and at most two pieces can be missing.
+def missing_ranges(coverage, start: date, end: date) -> list[tuple[date, date]]:
+    if start >= end:
+        return []
+    if coverage is None:
+        return [(start, end)]
+
+    covered_start, covered_end = coverage
+    missing = []
+    if start < covered_start:
+        missing.append((start, covered_start))
+    if end > covered_end:
+        missing.append((covered_end, end))
+    return missing
+
+
+# Returns True if the range [start, end) contains at least one weekday.
+def _has_weekdays(start: date, end: date) -> bool:
+    day = start
+    while day < end:
+        if day.weekday() < 5:
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+# Saves downloaded closes for a ticker and widens its covered date range.
+#
+# Parameters:
+# - conn: Open cache connection for the ticker.
+# - closes: Series of closing prices indexed by date.
+# - start, end: The [start, end) range that was requested from the provider.
+#
+def _store(conn: sqlite3.Connection, closes: pd.Series, start: date, end: date) -> None:
+    rows = [(pd.Timestamp(day).date().isoformat(), float(price)) for day, price in closes.items()]
+    conn.executemany("INSERT OR REPLACE INTO prices (date, close) VALUES (?, ?)", rows)
+
+    coverage = _read_coverage(conn)
+    if coverage is not None:
+        start = min(start, coverage[0])
+        end = max(end, coverage[1])
+    conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                     [("start", start.isoformat()), ("end", end.isoformat())])
+
+
+# Stores one downloaded range, unless it looks like a failed download.
+def _store_download(conn: sqlite3.Connection, closes: pd.Series, start: date, end: date) -> None:
+    # An empty answer for a range with trading days usually means the
+    # provider failed (e.g. rate limiting), so don't mark it as covered
+    if closes.empty and _has_weekdays(start, end):
+        return
+
+    with conn:
+        _store(conn, closes, start, end)
+
+
+# Reads the cached closes for [start, end) as a Series indexed by Timestamp.
+def read_cached_closes(conn: sqlite3.Connection, start: date, end: date) -> pd.Series:
+    rows = conn.execute("SELECT date, close FROM prices WHERE date >= ? AND date < ? ORDER BY date",
+                        (start.isoformat(), end.isoformat())).fetchall()
+    if not rows:
+        return pd.Series(dtype=float, name="Close")
+    index = pd.to_datetime([row[0] for row in rows])
+    return pd.Series([row[1] for row in rows], index=index, name="Close", dtype=float)
+
+
+# Returns daily closing prices for a ticker, reading the local cache first and
+# only downloading the date ranges that are missing from it.
+#
+# Parameters:
+# - ticker: The stock ticker (e.g. "AAPL").
+# - start: First date wanted (inclusive).
+# - end: Last date wanted (exclusive).
+# - cache_dir: Folder holding the per-ticker cache files (CACHE_DIR if None).
+# - source: PriceSource used to fetch missing ranges (default_source() if None).
+#
+# If downloading a missing range fails, the cached closes are returned without
+# it; the error is only raised when nothing is cached for [start, end).
+#
+def get_daily_closes(ticker: str, start: date, end: date, cache_dir: str = None,
+                     source: PriceSource = None) -> pd.Series:
+    if source is None:
+        source = default_source()
+    if not source.cacheable:
+        return source.get_daily_closes(ticker, start, end)
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    with closing(_connect(ticker, cache_dir)) as conn:
+        gaps = missing_ranges(_read_coverage(conn), start, end)
+        stock_data.metrics.count("cache_misses" if gaps else "cache_hits")
+        error = None
+        for gap_start, gap_end in gaps:
+            try:
+                closes = source.get_daily_closes(ticker, gap_start, gap_end)
+            except Exception as download_error:
+                # Leave the gap uncovered so the next run asks again
+                error = download_error
+                continue
+            _store_download(conn, closes, gap_start, gap_end)
+
+        cached = read_cached_closes(conn, start, end)
+
+    # A failed top-up only matters when there is nothing cached to fall back on
+    if cached.empty and error is not None:
+        raise error
+    return cached
+
+
+# Batched version of get_daily_closes for a whole watchlist.
+#
+# Tickers missing the same date range are downloaded together, chunk_size
+# tickers per provider request, so the number of round trips stays small no
+# matter how many tickers are listed.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - start: First date wanted (inclusive).
+# - end: Last date wanted (exclusive).
+# - cache_dir: Folder holding the per-ticker cache files (CACHE_DIR if None).
+# - chunk_size: Maximum number of tickers per provider request.
+# - source: PriceSource used to fetch missing ranges (default_source() if None).
+#
+# Returns a dict of ticker -> Series of closes, in the same order as tickers.
+# Failed downloads are handled as in get_daily_closes.
+#
+def get_daily_closes_batch(tickers: list[str], start: date, end: date, cache_dir: str = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           source: PriceSource = None) -> dict[str, pd.Series]:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    tickers = list(dict.fromkeys(tickers))
+    if source is None:
+        source = default_source()
+    if not source.cacheable:
+        return source.get_daily_closes_batch(tickers, start, end)
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+
+    # Group tickers by the date range they are missing
+    gaps: dict[tuple[date, date], list[str]] = {}
+    for ticker in tickers:
+        with closing(_connect(ticker, cache_dir)) as conn:
+            ticker_gaps = missing_ranges(_read_coverage(conn), start, end)
+        stock_data.metrics.count("cache_misses" if ticker_gaps else "cache_hits")
+        for gap in ticker_gaps:
+            gaps.setdefault(gap, []).append(ticker)
+
+    # Download each group in chunks and store the results. A failed download
+    # leaves its gap uncovered, the same as an empty one.
+    error = None
+    for (gap_start, gap_end), gap_tickers in gaps.items():
+        for i in range(0, len(gap_tickers), chunk_size):
+            chunk = gap_tickers[i:i + chunk_size]
+            try:
+                downloaded = source.get_daily_closes_batch(chunk, gap_start, gap_end)
+            except Exception as download_error:
+                error = download_error
+                continue
+            for ticker in chunk:
+                closes = downloaded.get(ticker, pd.Series(dtype=float))
+                with closing(_connect(ticker, cache_dir)) as conn:
+                    _store_download(conn, closes, gap_start, gap_end)
+
+    results = {}
+    for ticker in tickers:
+        with closing(_connect(ticker, cache_dir)) as conn:
+            results[ticker] = read_cached_closes(conn, start, end)
+
+    # Only fail if a download failed and nothing at all is cached to fall back on
+    if error is not None and all(closes.empty for closes in results.values()):
+        raise error
+    return results
@@ -0,0 +1,54 @@
+# This module holds PriceTable, a compact columnar container for the prices
+# of many tickers.
+#
+# Instead of a list of [ticker, dates, prices] lists full of Python objects,
+# all tickers share two 2-D NumPy arrays: one of datetime64 dates and one of
+# float64 prices, with one row per ticker. Rows shorter than the longest one
+# are padded at the end with NaT/NaN, and counts says how many points each row
+# really has.
+
+import numpy as np
+
+
+class PriceTable:
+    def __init__(self, tickers: list[str], dates: np.ndarray, prices: np.ndarray, counts: np.ndarray):
+        self.tickers = list(tickers)
+        self.dates = dates    # shape (tickers, points), datetime64[D]
+        self.prices = prices  # shape (tickers, points), float64
+        self.counts = counts  # shape (tickers,), number of real points in each row
+
+    # Builds a table from a dict of ticker -> Series of prices indexed by date.
+    # Tickers listed in tickers but missing from series (or empty) get an empty row.
+    @classmethod
+    def from_series(cls, tickers: list[str], series: dict):
+        counts = np.array([len(series[t]) if t in series else 0 for t in tickers], dtype=np.int64)
+        width = int(counts.max()) if len(counts) else 0
+
+        dates = np.full((len(tickers), width), np.datetime64("NaT"), dtype="datetime64[D]")
+        prices = np.full((len(tickers), width), np.nan, dtype=np.float64)
+        for i, ticker in enumerate(tickers):
+            if counts[i]:
+                values = series[ticker]
+                dates[i, :counts[i]] = values.index.to_numpy().astype("datetime64[D]")
+                prices[i, :counts[i]] = values.to_numpy(dtype=np.float64)
+        return cls(tickers, dates, prices, counts)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    # Returns True for each ticker that has at least one price.
+    def has_data(self) -> np.ndarray:
+        return self.counts > 0
+
+    # Returns the (dates, prices) arrays of one ticker, without padding.
+    # These are views into the table, so nothing is copied.
+    def row(self, ticker):
+        i = ticker if isinstance(ticker, (int, np.integer)) else self.tickers.index(ticker)
+        count = self.counts[i]
+        return self.dates[i, :count], self.prices[i, :count]
+
+    # Returns a new table holding only the rows where mask is True.
+    def select(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        tickers = [t for t, keep in zip(self.tickers, mask) if keep]
+        return PriceTable(tickers, self.dates[mask], self.prices[mask], self.counts[mask])
@@ -0,0 +1,49 @@
+# This module picks the first trading day of each period (week, month or
+# quarter) out of a price history in a single vectorized pass.
+
+import numpy as np
+import pandas as pd
+
+
+# Supported sampling periods and their pandas period codes
+PERIODS = {
+    "weekly": "W",
+    "monthly": "M",
+    "quarterly": "Q",
+}
+
+
+# Returns the first row of each period in a price history.
+#
+# Parameters:
+# - data: DataFrame or Series indexed by timestamp (daily, intraday, ...).
+# - period: "weekly", "monthly" or "quarterly".
+# - column: Optional column to keep when data is a DataFrame (e.g. "Close").
+#
+# The returned rows keep their original timestamps, so the index holds the
+# first trading day (or first bar) of each period, oldest to newest.
+#
+def first_of_period(data, period: str = "monthly", column: str = None):
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'. Choose from: {', '.join(PERIODS)}")
+
+    if column is not None and isinstance(data, pd.DataFrame):
+        data = data[column]
+    if len(data) == 0:
+        return data
+
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+
+    # Periods are worked out on local wall-clock time so intraday bars fall in the right day
+    index = data.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    # A row starts a new period whenever its period number differs from the row before it
+    codes = index.to_period(PERIODS[period]).asi8
+    is_first = np.empty(len(codes), dtype=bool)
+    is_first[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=is_first[1:])
+
+    return data[is_first]
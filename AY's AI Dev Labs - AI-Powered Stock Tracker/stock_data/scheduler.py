@@ -0,0 +1,245 @@
+# This module keeps the tracker's requests to a price provider under the
+# provider's rate limit.
+#
+# FetchScheduler wraps another PriceSource (normally YFinanceSource) and:
+# - waits for a token from a token bucket before every request, so bursts are
+#   smoothed out to a steady rate instead of being rejected by the provider;
+# - shares one request between callers asking for the same thing at once;
+# - retries failed or empty answers with exponential backoff (with jitter), and
+#   pauses every caller during the backoff so one failure doesn't cause more;
+# - parks requests that still fail in a queue, answering them with the same
+#   error straight away until retry_failed() gives them another go.
+#
+# De-duplication and the token bucket live in memory, so they are shared by
+# every thread in one process, not across separate tracker processes.
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date
+
+import numpy as np
+
+import stock_data.concurrent_fetch
+import stock_data.metrics
+from stock_data.sources import PriceSource, YFinanceSource
+
+
+# Defaults for FetchScheduler
+DEFAULT_RATE = 2.0         # requests per second
+DEFAULT_BURST = 5          # requests that may be made back to back after a quiet spell
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0      # seconds before the first retry, doubled after each one
+DEFAULT_MAX_BACKOFF = 30.0
+
+
+# Raised when the provider answered with no data for a range that has trading days.
+class EmptyResponseError(LookupError):
+    pass
+
+
+# Token Bucket Class
+#
+# Holds up to "capacity" tokens and refills at "rate" tokens per second.
+# Every request takes one token, waiting for the next one if none is left.
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    # Blocks until a token is available and takes it.
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait_time)
+
+    # Stops handing out tokens for the next "seconds" seconds (used while backing off).
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+# Returns True if [start, end) is sure to hold trading days, i.e. an empty answer
+# means the request failed. A single weekday may be a market holiday (a top-up
+# run the day after one asks for just that day), so it takes at least two.
+def _has_trading_days(start: date, end: date) -> bool:
+    return start < end and np.busday_count(start, end) > 1
+
+
+# Returns True if a provider answer holds no prices at all.
+def _is_empty(result) -> bool:
+    if isinstance(result, dict):
+        return all(_is_empty(value) for value in result.values())
+    return result is None or result.empty
+
+
+# Fetch Scheduler Class
+#
+# A PriceSource that sends every request of the wrapped source through a
+# shared token bucket, with de-duplication, backoff and a retry queue.
+class FetchScheduler(PriceSource):
+    def __init__(self, source: PriceSource, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        self.source = source
+        self.cacheable = source.cacheable
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._in_flight = {}  # request key -> Future shared by everyone waiting on it
+        self._recovered = {}  # request key -> answer found by retry_failed, handed out once
+        self.failed = {}      # request key -> (call, expect_data, last error), oldest first
+
+    def get_daily_closes(self, ticker: str, start: date, end: date):
+        return self._request(("closes", ticker, start, end),
+                             lambda: self.source.get_daily_closes(ticker, start, end), _has_trading_days(start, end))
+
+    def get_daily_closes_batch(self, tickers: list[str], start: date, end: date):
+        return self._request(("batch", tuple(tickers), start, end),
+                             lambda: self.source.get_daily_closes_batch(tickers, start, end),
+                             _has_trading_days(start, end))
+
+    def get_daily_bars(self, ticker: str, start: date, end: date):
+        return self._request(("bars", ticker, start, end),
+                             lambda: self.source.get_daily_bars(ticker, start, end), _has_trading_days(start, end))
+
+    def get_intraday_closes(self, ticker: str, start: date, end: date, interval: str):
+        return self._request(("intraday", ticker, start, end, interval),
+                             lambda: self.source.get_intraday_closes(ticker, start, end, interval),
+                             _has_trading_days(start, end))
+
+    def get_intraday_closes_batch(self, tickers: list[str], start: date, end: date, interval: str):
+        return self._request(("intraday_batch", tuple(tickers), start, end, interval),
+                             lambda: self.source.get_intraday_closes_batch(tickers, start, end, interval),
+                             _has_trading_days(start, end))
+
+    # Live quotes go out of date at once, so they are only rate limited:
+    # an empty answer (e.g. the market is closed) is normal and never queued.
+    def get_latest_prices(self, tickers: list[str]) -> dict[str, float]:
+        self.bucket.acquire()
+        return self.source.get_latest_prices(tickers)
+
+    # Tries every queued request once more (with the usual retries), max_workers
+    # at a time. The whole pass gives up after time_limit seconds, so a long
+    # queue can't block the caller for much longer than its first pass did;
+    # requests that didn't get an answer in time stay queued.
+    # Answers that come back are kept until the next identical request picks them up.
+    #
+    # Returns the number of requests that succeeded this time.
+    #
+    def retry_failed(self, max_workers: int = stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                     time_limit: float = stock_data.concurrent_fetch.DEFAULT_TIMEOUT) -> int:
+        with self._lock:
+            queued = dict(self.failed)
+            self.failed.clear()
+        if not queued:
+            return 0
+
+        deadline = time.monotonic() + time_limit
+
+        def retry_one(key):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Gave up retrying after {time_limit} seconds")
+            call, expect_data, _ = queued[key]
+            return self._call_with_retries(call, expect_data)
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(queued)))
+        futures = {executor.submit(retry_one, key): key for key in queued}
+        done, _ = wait(futures, timeout=time_limit)
+        # Python threads can't be stopped, so calls still running are abandoned
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        recovered = 0
+        with self._lock:
+            for future, key in futures.items():
+                if future in done:
+                    error = future.exception()
+                else:
+                    error = TimeoutError(f"Gave up retrying after {time_limit} seconds")
+                if error is None:
+                    self._recovered[key] = future.result()
+                    recovered += 1
+                else:
+                    self.failed[key] = (queued[key][0], queued[key][1], error)
+        return recovered
+
+    # Runs one request, or waits for the identical one already running.
+    def _request(self, key, call, expect_data: bool):
+        with self._lock:
+            if key in self._recovered:
+                return self._recovered.pop(key)
+            if key in self.failed:
+                raise self.failed[key][2]
+
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_owner:
+            stock_data.metrics.count("requests_deduplicated")
+            return future.result()
+
+        try:
+            result = self._call_with_retries(call, expect_data)
+        except Exception as error:
+            with self._lock:
+                del self._in_flight[key]
+                self.failed[key] = (call, expect_data, error)
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    # Calls the provider, retrying errors and unexpectedly empty answers.
+    def _call_with_retries(self, call, expect_data: bool):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                result = call()
+                if expect_data and _is_empty(result):
+                    raise EmptyResponseError("The provider returned no data.")
+                return result
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                stock_data.metrics.count("provider_retries")
+
+                # Full jitter keeps instances that failed together from retrying together
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+                self.bucket.pause(delay)
+
+
+# The scheduler shared by every caller of shared_scheduler()
+_shared = None
+_shared_lock = threading.Lock()
+
+
+# Returns the process-wide FetchScheduler around Yahoo Finance, creating it on first use.
+def shared_scheduler() -> FetchScheduler:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FetchScheduler(YFinanceSource())
+        return _shared
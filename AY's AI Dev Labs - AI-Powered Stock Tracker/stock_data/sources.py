@@ -0,0 +1,277 @@
+# This module holds the price sources the tracker can read from.
+#
+# Every source answers the same two questions: "what were the daily closes of
+# this ticker between start and end?" and the same for a list of tickers.
+# YFinanceSource asks Yahoo Finance over the network, while ReplaySource reads
+# recorded CSV/Parquet files from a folder, so the rest of the pipeline can be
+# tested and benchmarked on machines without internet access.
+
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+
+import stock_data.metrics
+
+
+# Environment variable that, when set to a folder, makes default_source() replay files from it
+REPLAY_DIR_ENV = "STOCK_TRACKER_REPLAY_DIR"
+
+# Environment variable that, when set to a folder, makes default_source() read a PriceArchive
+ARCHIVE_DIR_ENV = "STOCK_TRACKER_ARCHIVE_DIR"
+
+# Columns of a daily bar, as returned by get_daily_bars
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Bar sizes accepted by get_intraday_closes
+INTRADAY_INTERVALS = ("1m", "5m", "1h")
+
+# How many days back Yahoo Finance serves each intraday bar size
+MAX_INTRADAY_DAYS = {"1m": 7, "5m": 60, "1h": 730}
+
+# Defaults for polling get_latest_prices in live mode (charts.live_chart and
+# the live output of stock_nums)
+LIVE_INTERVAL = 15.0  # seconds between polls
+LIVE_CAPACITY = 240   # newest prices kept per ticker (one hour at 15 s)
+
+
+# Pulls the Close column out of a price frame as a plain float Series.
+# Newer versions of yfinance return one column per ticker even for a single
+# ticker, so the first column is taken in that case.
+def _close_series(data: pd.DataFrame) -> pd.Series:
+    if data is None or data.empty:
+        return pd.Series(dtype=float)
+    close = data["Close"]
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.dropna().astype(float)
+
+
+# Splits the Close columns of a multi-ticker download into one Series per
+# ticker. Tickers the provider had no data for get an empty Series.
+def _batch_close_series(data: pd.DataFrame, tickers: list[str]) -> dict[str, pd.Series]:
+    results = {ticker: pd.Series(dtype=float) for ticker in tickers}
+    if data is None or data.empty:
+        return results
+
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    for ticker in tickers:
+        if ticker in close.columns:
+            results[ticker] = close[ticker].dropna().astype(float)
+    return results
+
+
+# Checks that an intraday bar size is supported.
+def _check_interval(interval: str) -> None:
+    if interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"interval must be one of: {', '.join(INTRADAY_INTERVALS)}")
+
+
+# Counts a provider download in the metrics. yfinance doesn't report the size
+# of the HTTP response, so the in-memory size of the parsed frame is counted instead.
+def _count_download(data: pd.DataFrame) -> None:
+    stock_data.metrics.count("downloads")
+    if data is not None:
+        stock_data.metrics.count("bytes_downloaded", int(data.memory_usage(deep=True).sum()))
+
+
+# Base Price Source Class
+class PriceSource:
+    # Whether results from this source are worth keeping in the on-disk price cache
+    cacheable = True
+
+    # Returns daily closing prices for [start, end) as a Series indexed by date.
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        raise NotImplementedError
+
+    # Returns a dict of ticker -> Series of daily closes for [start, end).
+    # Sources that can fetch many tickers in one request should override this.
+    def get_daily_closes_batch(self, tickers: list[str], start: date, end: date) -> dict[str, pd.Series]:
+        return {ticker: self.get_daily_closes(ticker, start, end) for ticker in tickers}
+
+    # Returns intraday closing prices for [start, end) as a Series indexed by
+    # timestamp, one per bar of the given size ("1m", "5m" or "1h").
+    def get_intraday_closes(self, ticker: str, start: date, end: date, interval: str) -> pd.Series:
+        raise NotImplementedError
+
+    # Returns a dict of ticker -> Series of intraday closes for [start, end).
+    def get_intraday_closes_batch(self, tickers: list[str], start: date, end: date,
+                                  interval: str) -> dict[str, pd.Series]:
+        return {ticker: self.get_intraday_closes(ticker, start, end, interval) for ticker in tickers}
+
+    # Returns daily Open/High/Low/Close/Volume bars for [start, end) as a DataFrame
+    # indexed by date. Used to fill the long-term price archive (see archive.py).
+    def get_daily_bars(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        raise NotImplementedError
+
+    # Returns a dict of ticker -> latest traded price, leaving out tickers with no quote.
+    # Used by the live chart, which calls it over and over at a fixed interval.
+    def get_latest_prices(self, tickers: list[str]) -> dict[str, float]:
+        raise NotImplementedError
+
+
+# Yahoo Finance Source
+#
+# yfinance is slow to import, so it is only loaded the first time a download is made.
+class YFinanceSource(PriceSource):
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        import yfinance as yf
+
+        data = yf.download(ticker, start=start, end=end, interval="1d", progress=False)
+        _count_download(data)
+        return _close_series(data)
+
+    def get_daily_bars(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        import yfinance as yf
+
+        data = yf.download(ticker, start=start, end=end, interval="1d", progress=False, multi_level_index=False)
+        _count_download(data)
+        if data is None or data.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS, dtype=float)
+        return data[list(BAR_COLUMNS)].dropna(subset=["Close"]).astype(float)
+
+    # Downloads all tickers in one provider request. Tickers the provider had no
+    # data for get an empty Series.
+    def get_daily_closes_batch(self, tickers: list[str], start: date, end: date) -> dict[str, pd.Series]:
+        import yfinance as yf
+
+        data = yf.download(tickers, start=start, end=end, interval="1d", group_by="column", progress=False)
+        _count_download(data)
+        return _batch_close_series(data, tickers)
+
+    # Yahoo only keeps a limited history of intraday bars (see MAX_INTRADAY_DAYS),
+    # so earlier days of the range are left out instead of failing the request.
+    def get_intraday_closes(self, ticker: str, start: date, end: date, interval: str) -> pd.Series:
+        return self.get_intraday_closes_batch([ticker], start, end, interval)[ticker]
+
+    def get_intraday_closes_batch(self, tickers: list[str], start: date, end: date,
+                                  interval: str) -> dict[str, pd.Series]:
+        import yfinance as yf
+
+        _check_interval(interval)
+        start = max(start, date.today() - timedelta(days=MAX_INTRADAY_DAYS[interval] - 1))
+        data = yf.download(tickers, start=start, end=end, interval=interval, group_by="column", progress=False)
+        _count_download(data)
+        return _batch_close_series(data, tickers)
+
+    # Takes the last one-minute bar of today for every ticker, in one request.
+    def get_latest_prices(self, tickers: list[str]) -> dict[str, float]:
+        import yfinance as yf
+
+        data = yf.download(tickers, period="1d", interval="1m", group_by="column", progress=False)
+        _count_download(data)
+        if data is None or data.empty:
+            return {}
+
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        latest = {}
+        for ticker in tickers:
+            if ticker in close.columns:
+                values = close[ticker].dropna()
+                if not values.empty:
+                    latest[ticker] = float(values.iloc[-1])
+        return latest
+
+
+# Replay Source
+#
+# Reads recorded prices from a folder holding one "<TICKER>.csv" or
+# "<TICKER>.parquet" file per ticker. Each file needs a date column (or index)
+# first and a "Close" column. Files are read once and then kept in memory, so
+# repeated runs over the same fixtures are deterministic and network-free.
+# Reading Parquet files needs pyarrow (or fastparquet) to be installed.
+class ReplaySource(PriceSource):
+    # The files are already local, so there is no point copying them into the cache
+    cacheable = False
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.loaded = {}  # ticker -> full Series of closes
+        self.replay_positions = {}  # ticker -> index of the next price get_latest_prices returns
+
+    # Loads (or returns the already loaded) full history for a ticker.
+    def _load(self, ticker: str) -> pd.Series:
+        if ticker not in self.loaded:
+            closes = pd.Series(dtype=float)
+            parquet_path = os.path.join(self.folder, f"{ticker}.parquet")
+            csv_path = os.path.join(self.folder, f"{ticker}.csv")
+            if os.path.exists(parquet_path):
+                stock_data.metrics.count("bytes_read", os.path.getsize(parquet_path))
+                closes = _close_series(pd.read_parquet(parquet_path))
+            elif os.path.exists(csv_path):
+                stock_data.metrics.count("bytes_read", os.path.getsize(csv_path))
+                closes = _close_series(pd.read_csv(csv_path, index_col=0, parse_dates=True))
+            self.loaded[ticker] = closes.sort_index()
+        return self.loaded[ticker]
+
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        closes = self._load(ticker)
+        if closes.empty:
+            return closes
+        return closes[(closes.index >= pd.Timestamp(start)) & (closes.index < pd.Timestamp(end))]
+
+    # Intraday files hold one row per bar (a timestamp instead of a date) and
+    # are replayed as recorded, whatever bar size they were saved with.
+    def get_intraday_closes(self, ticker: str, start: date, end: date, interval: str) -> pd.Series:
+        _check_interval(interval)
+        return self.get_daily_closes(ticker, start, end)
+
+    # Plays the recorded closes back one at a time: every call returns the next
+    # price of each ticker, starting over once the end of the file is reached.
+    def get_latest_prices(self, tickers: list[str]) -> dict[str, float]:
+        latest = {}
+        for ticker in tickers:
+            closes = self._load(ticker)
+            if closes.empty:
+                continue
+            position = self.replay_positions.get(ticker, 0) % len(closes)
+            latest[ticker] = float(closes.iloc[position])
+            self.replay_positions[ticker] = position + 1
+        return latest
+
+
+# Writes a ticker's closes to a replay folder so ReplaySource can read them back.
+#
+# Parameters:
+# - folder: The replay folder.
+# - ticker: The stock ticker the closes belong to.
+# - closes: Series of closing prices indexed by date.
+# - file_format: "csv" or "parquet".
+#
+def write_replay_file(folder: str, ticker: str, closes: pd.Series, file_format: str = "csv") -> str:
+    if file_format not in ("csv", "parquet"):
+        raise ValueError("file_format must be 'csv' or 'parquet'")
+
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{ticker}.{file_format}")
+    frame = closes.rename("Close").to_frame()
+    frame.index.name = "Date"
+    if file_format == "csv":
+        frame.to_csv(path)
+    else:
+        frame.to_parquet(path)
+    return path
+
+
+# Returns the source used when the caller doesn't pick one: a ReplaySource if
+# the STOCK_TRACKER_REPLAY_DIR environment variable is set, an ArchiveSource if
+# STOCK_TRACKER_ARCHIVE_DIR is set, otherwise Yahoo Finance behind the shared
+# rate-limited FetchScheduler (see scheduler.py).
+def default_source() -> PriceSource:
+    replay_dir = os.environ.get(REPLAY_DIR_ENV)
+    if replay_dir:
+        return ReplaySource(replay_dir)
+
+    archive_dir = os.environ.get(ARCHIVE_DIR_ENV)
+    if archive_dir:
+        from stock_data.archive import ArchiveSource
+
+        return ArchiveSource(archive_dir)
+
+    from stock_data.scheduler import shared_scheduler
+
+    return shared_scheduler()
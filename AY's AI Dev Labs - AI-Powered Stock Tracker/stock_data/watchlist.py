@@ -0,0 +1,51 @@
+# This module reads watchlists: the tickers (and their display labels) the
+# tracker should follow.
+#
+# A watchlist file has one ticker per line, optionally followed by a comma and
+# a label, e.g.:
+#   AAPL, Apple (AAPL)
+#   MSFT
+# Blank lines and lines starting with "#" are ignored. Files are read lazily,
+# line by line, so even very long watchlists are never held in memory at once.
+
+
+# The watchlist used when none is given
+DEFAULT_WATCHLIST = [
+    ("AAPL", "Apple (AAPL)"),
+    ("AMZN", "Amazon (AMZN)"),
+    ("GOOG", "Alphabet Inc. (GOOG)"),
+    ("NVDA", "NVIDIA Corp (NVDA)"),
+]
+
+
+# Yields (ticker, label) pairs from a watchlist file. Tickers without a label
+# use the ticker itself as the label.
+def read_watchlist(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            ticker, _, label = line.partition(",")
+            ticker = ticker.strip().upper()
+            yield ticker, label.strip() or ticker
+
+
+# Yields (ticker, label) pairs for a plain list of tickers.
+def from_tickers(tickers: list[str]):
+    for ticker in tickers:
+        yield ticker.upper(), ticker.upper()
+
+
+# Groups an iterable into lists of at most "size" items, reading it lazily.
+def chunked(items, size: int):
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
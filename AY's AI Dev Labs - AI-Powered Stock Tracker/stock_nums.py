@@ -1,63 +1,256 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+from datetime import date, datetime, timedelta
+import argparse
+import csv
 import sys
 import os
+import threading
 
-import widgets.loading_screen
+# Only the data pipeline is imported up front. pyplot, the chart modules and the
+# pygame loading screen are imported inside the functions that use them, so
+# cached, headless and command-line runs never pay for loading them.
+import stock_data.concurrent_fetch
+import stock_data.correlation
+import stock_data.forecast
+import stock_data.indicators
+import stock_data.metrics
+import stock_data.portfolio
+import stock_data.price_cache
+import stock_data.price_table
+import stock_data.resample
+import stock_data.scheduler
+import stock_data.sources
+import stock_data.watchlist
 
 
-# Gets a fills in a raw stock array
+# Gets the closing price of the first trading day of each month for the past year
 #
 # Parameters:
-# - data_arrays: List of lists of floats. Each sub-list is one line.
-# - labels: Optional list of labels for each line.
-# - title: Title of the graph.
-# - xlabel: Label for the X-axis.
-# - ylabe
-def get_first_of_month_prices(ticker: str):
+# - ticker: The stock ticker (e.g. "AAPL").
+# - source: Optional PriceSource to read from (Yahoo Finance, or a replay folder
+#   if STOCK_TRACKER_REPLAY_DIR is set, when not given).
+#
+# Returns a [ticker, dates, prices] record, or [] if no data is available.
+#
+def get_first_of_month_prices(ticker: str, source: stock_data.sources.PriceSource = None):
+    start_date, today = _last_year_range()
+
+    # Read the past year of daily closes from the local cache, downloading only missing days
+    closes = stock_data.price_cache.get_daily_closes(ticker, start_date, today, source=source)
+
+    return _first_of_month_record(ticker, closes, start_date)
+
+
+# Fetches any date range for a list of tickers and samples the first trading day
+# of each period.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - start_date: First date wanted (inclusive). A period that starts before it is left out.
+# - end_date: Last date wanted (exclusive).
+# - period: "weekly", "monthly" or "quarterly".
+# - max_workers: Maximum number of batches fetched at the same time.
+# - timeout: Seconds each batch may take, retries included.
+# - retries: How many times a failed batch is tried again.
+# - on_progress: Optional function called as on_progress(done, total) each time a
+#   batch finishes (successfully or not), counting tickers.
+# - source: Optional PriceSource to read from.
+# - batch_size: Most tickers sent to the provider in one request.
+# - cache_dir: Folder of the price cache (stock_data.price_cache.CACHE_DIR if None).
+#
+# Returns a stock_data.price_table.PriceTable with one row per ticker.
+#
+def get_price_table(tickers: list[str], start_date, end_date, period: str = "monthly",
+                    max_workers: int = stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                    timeout: float = stock_data.concurrent_fetch.DEFAULT_TIMEOUT,
+                    retries: int = stock_data.concurrent_fetch.DEFAULT_RETRIES,
+                    on_progress=None, source: stock_data.sources.PriceSource = None,
+                    batch_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE, cache_dir: str = None):
+    all_closes = _fetch_closes_concurrent(tickers, start_date, end_date, max_workers, timeout, retries, on_progress,
+                                          source, batch_size, cache_dir)
+    return _to_price_table(tickers, _resample_closes(all_closes, start_date, period))
+
+
+# Samples the first trading day of each period from every ticker's daily closes
+# (the "resample" stage). Returns a dict of ticker -> Series of sampled prices.
+def _resample_closes(all_closes: dict, start_date, period: str) -> dict:
+    with stock_data.metrics.timer("resample"):
+        sampled = {ticker: _sample_series(closes, start_date, period).round(2) for ticker, closes in all_closes.items()}
+    stock_data.metrics.count("rows_resampled", sum(len(closes) for closes in all_closes.values()))
+    return sampled
+
+
+# Packs sampled prices into a PriceTable with one row per ticker (the "convert" stage).
+def _to_price_table(tickers: list[str], sampled: dict):
+    with stock_data.metrics.timer("convert"):
+        return stock_data.price_table.PriceTable.from_series(list(dict.fromkeys(tickers)), sampled)
+
+
+# Streams a watchlist of any size through the pipeline, chunk_size tickers at a
+# time, so only one chunk of prices is in memory at once. Each chunk is fetched
+# as a few batched provider requests of batch_size tickers, so a cold 2,000
+# ticker watchlist costs about 40 requests rather than 2,000.
+#
+# Parameters:
+# - watchlist: Iterable of (ticker, label) pairs (see stock_data.watchlist).
+# - start_date, end_date, period: As for get_price_table.
+# - chunk_size: Number of tickers fetched and processed together.
+# - max_workers, timeout, retries, source, batch_size: As for get_price_table.
+#
+# Yields (table, labels) for each chunk, where labels line up with table.tickers.
+#
+def iter_price_tables(watchlist, start_date, end_date, period: str = "monthly", chunk_size: int = 200,
+                      max_workers: int = stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                      timeout: float = stock_data.concurrent_fetch.DEFAULT_TIMEOUT,
+                      retries: int = stock_data.concurrent_fetch.DEFAULT_RETRIES,
+                      source: stock_data.sources.PriceSource = None,
+                      batch_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE):
+    if source is None:
+        source = stock_data.sources.default_source()
+
+    for chunk in stock_data.watchlist.chunked(watchlist, chunk_size):
+        labels = dict(reversed(chunk))  # first label wins for repeated tickers
+        table = get_price_table([ticker for ticker, _ in chunk], start_date, end_date, period,
+                                max_workers=max_workers, timeout=timeout, retries=retries, source=source,
+                                batch_size=batch_size)
+        yield table, [labels[ticker] for ticker in table.tickers]
+
+
+# Fetches intraday closes (one per bar) for a list of tickers, chunk_size
+# tickers per provider request. Intraday bars are not kept in the price cache.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - start_date: First date wanted (inclusive).
+# - end_date: Last date wanted (exclusive).
+# - interval: Bar size, "1m", "5m" or "1h".
+# - chunk_size: Maximum number of tickers per provider request.
+# - source: Optional PriceSource to read from.
+#
+# Returns a dict of ticker -> Series of closes indexed by timestamp, in the same
+# order as tickers, leaving out tickers with no data.
+#
+def get_intraday_closes(tickers: list[str], start_date, end_date, interval: str,
+                        chunk_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE,
+                        source: stock_data.sources.PriceSource = None):
+    if source is None:
+        source = stock_data.sources.default_source()
+
+    all_closes = {}
+    with stock_data.metrics.timer("fetch"):
+        for chunk in stock_data.watchlist.chunked(dict.fromkeys(tickers), chunk_size):
+            try:
+                downloaded = source.get_intraday_closes_batch(chunk, start_date, end_date, interval)
+            except Exception as error:
+                print(f"Could not fetch {', '.join(chunk)}: {error}")
+                continue
+            for ticker in chunk:
+                if downloaded.get(ticker) is None or downloaded[ticker].empty:
+                    print(f"No data available for {ticker}.")
+                else:
+                    all_closes[ticker] = downloaded[ticker]
+
+    stock_data.metrics.count("rows_fetched", sum(len(closes) for closes in all_closes.values()))
+    return all_closes
+
+
+# Fetches daily closes for [start_date, end_date) for every ticker on a thread pool.
+# The tickers are split into batches of chunk_size, and each worker fetches one
+# batch at a time through the price cache, so a batch costs one provider request
+# (per missing date range) instead of one per ticker. The timeout and retries
+# apply to each batch.
+#
+# Returns a dict of ticker -> Series for the tickers that succeeded.
+#
+def _fetch_closes_concurrent(tickers, start_date, end_date, max_workers, timeout, retries, on_progress, source,
+                             chunk_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE, cache_dir: str = None):
+    if source is None:
+        source = stock_data.sources.default_source()
+    tickers = list(dict.fromkeys(tickers))
+    total = len(tickers)
+    finished = []
+
+    def fetch_chunk(chunk):
+        closes = stock_data.price_cache.get_daily_closes_batch(list(chunk), start_date, end_date, cache_dir=cache_dir,
+                                                               chunk_size=chunk_size, source=source)
+        if all(series.empty for series in closes.values()):
+            raise LookupError(f"No data available for {', '.join(chunk)}.")
+        return closes
+
+    def on_done(chunk, result, error):
+        finished.extend(chunk)
+        if on_progress is not None:
+            on_progress(len(finished), total)
+
+    # Splits the batches' results into closes and errors per ticker
+    def fetch_chunks(chunks, retries, on_done=None):
+        results, chunk_errors = stock_data.concurrent_fetch.fetch_all(chunks, fetch_chunk, max_workers=max_workers,
+                                                                      timeout=timeout, retries=retries,
+                                                                      on_done=on_done)
+        chunk_closes, errors = {}, {}
+        for chunk, closes in results.items():
+            for ticker in chunk:
+                if closes[ticker].empty:
+                    errors[ticker] = LookupError(f"No data available for {ticker}.")
+                else:
+                    chunk_closes[ticker] = closes[ticker]
+        for chunk, error in chunk_errors.items():
+            errors.update(dict.fromkeys(chunk, error))
+        return chunk_closes, errors
+
+    chunks = [tuple(tickers[i:i + chunk_size]) for i in range(0, len(tickers), chunk_size)]
+    with stock_data.metrics.timer("fetch"):
+        all_closes, errors = fetch_chunks(chunks, retries, on_done)
+
+    # Requests the provider kept failing on were queued by the scheduler. Now that
+    # the others are done and the rate limit has recovered, give the batches
+    # holding failed tickers one more pass, bounded by the same timeout as a batch.
+    if errors and isinstance(source, stock_data.scheduler.FetchScheduler):
+        with stock_data.metrics.timer("fetch"):
+            if source.retry_failed(max_workers, time_limit=timeout):
+                recovered, retry_errors = fetch_chunks([chunk for chunk in chunks if errors.keys() & set(chunk)], 0)
+                all_closes.update(recovered)
+                errors = {ticker: retry_errors[ticker] for ticker in errors if ticker in retry_errors}
+
+    stock_data.metrics.count("rows_fetched", sum(len(closes) for closes in all_closes.values()))
+    stock_data.metrics.count("fetch_errors", len(errors))
+    for ticker, error in errors.items():
+        print(f"Could not fetch {ticker}: {error}")
+    return all_closes
+
+
+# Returns the (start, end) dates of the past year of daily data used for monthly prices:
+# from the first day of the month 12 months ago up to (not including) today.
+def _last_year_range():
     today = datetime.now().date()
-    start_date = (today.replace(day=1) - timedelta(days=365))
+    start_date = (pd.Timestamp(today.replace(day=1)) - pd.DateOffset(months=12)).date()
+    return start_date, today
 
-    # Download daily historical data for the past year
-    data = yf.download(ticker, start=start_date, end=today, interval="1d", progress=False)
 
-    if data.empty:
+# Turns a Series of daily closes into a [ticker, dates, prices] record holding the
+# close of the first trading day of each month since start_date.
+def _first_of_month_record(ticker: str, closes: pd.Series, start_date):
+    if closes.empty:
         print(f"No data available for {ticker}.")
         return []
 
-    # Keep only 'Close' prices
-    data = data[['Close']].copy()
-
-    prices = []  # this will store the monthly prices
-    dates = []   # optional: keep track of which month each price is for
-
-    # Loop through the last 12 months
-    for i in range(13):
-        target_month = today.month - i
-        target_year = today.year
-        while target_month <= 0:
-            target_month += 12
-            target_year -= 1
-        first_day = datetime(target_year, target_month, 1)
-
-        # Find the first available trading day of that month
-        month_data = data.loc[data.index >= pd.Timestamp(first_day)]
-        month_data = month_data[month_data.index.month == first_day.month]
-        if not month_data.empty:
-            first_trading_day = month_data.index[0]
-            close_price = month_data.iloc[0]["Close"]
-            prices.append(round(close_price, 2))
-            dates.append(first_trading_day.date())
-
-    # Reverse so it goes oldest to newest
-    prices = prices[::-1]
-    dates = dates[::-1]
+    monthly = _sample_series(closes, start_date, "monthly")
+    prices = [round(float(price), 2) for price in monthly.to_numpy()]  # oldest to newest
+    dates = [day.date() for day in monthly.index]
 
     return [ticker, dates, prices]
 
 
+# Returns the close of the first trading day of each period, oldest first.
+# A period that began before start_date is dropped, since its real first
+# trading day was never fetched.
+def _sample_series(closes: pd.Series, start_date, period: str) -> pd.Series:
+    sampled = stock_data.resample.first_of_period(closes, period)
+    period_starts = sampled.index.to_period(stock_data.resample.PERIODS[period]).start_time
+    return sampled[period_starts >= pd.Timestamp(start_date)]
+
+
 # Plots lines on a single graph using given data.
 #
 # Parameters:
@@ -66,74 +259,507 @@ def get_first_of_month_prices(ticker: str):
 # - title: Title of the graph.
 # - xlabel: Label for the X-axis.
 # - ylabel: Label for the Y-axis.
+# - fast: Use the high-volume path (one LineCollection, min/max decimation to the
+#   plot width, few value labels). None picks it automatically for large data.
+# - value_labels: Which points get a value label in the fast path: "all",
+#   "extrema", "ends" or "none" (see charts.fast_render.draw_many_lines).
+# - forecasts: Optional list with one array of predicted future values per line,
+#   drawn as dashed lines (see stock_data.forecast).
+# - downsample: How the fast path cuts lines down to the plot width: "minmax"
+#   (the default) or "lttb", which better keeps the shape of long intraday lines.
 #
-def draw_line_graph(data_arrays, labels, title: str, xlabel: str, ylabel: str):
-    if not data_arrays:
+def draw_line_graph(data_arrays, labels, title: str, xlabel: str, ylabel: str, fast: bool = None,
+                    value_labels: str = None, forecasts=None, downsample: str = None):
+    if data_arrays is None or len(data_arrays) == 0:
         print("No data provided.")
         return
 
-    num_lines = len(data_arrays)
+    import matplotlib.pyplot as plt
+    import charts.line_graph
 
-    # If no labels provided, generate default ones
-    if labels is None or len(labels) != num_lines:
-        labels = [f"Line {i+1}" for i in range(num_lines)]
+    with stock_data.metrics.timer("render"):
+        plt.figure(figsize=(10, 6))
+        charts.line_graph.plot_lines(plt.gca(), data_arrays, labels, title, xlabel, ylabel,
+                                     fast=fast, value_labels=value_labels, forecasts=forecasts,
+                                     downsample=downsample)
+        plt.tight_layout()
+        plt.gcf().canvas.draw()  # matplotlib draws lazily, so do it here to count it as rendering
+    plt.show()
 
-    plt.figure(figsize=(10, 6))
 
-    for i, values in enumerate(data_arrays):
-        x = list(range(len(values)))  # X-axis indices
-        plt.plot(x, values, marker='o', linestyle='-', linewidth=2, markersize=6, label=labels[i])
-        # Optionally show values above each point
-        for xi, val in enumerate(values):
-            plt.text(xi, val, f"{val:.2f}", ha='center', va='bottom', fontsize=8)
+# Shows a ticker-by-ticker matrix (such as return correlations) as a heatmap.
+#
+# Parameters:
+# - matrix: N x N array of values.
+# - labels: One label per ticker.
+# - title: Title of the heatmap.
+#
+def draw_heatmap(matrix, labels, title: str):
+    if matrix is None or len(matrix) == 0:
+        print("No data provided.")
+        return
 
-    plt.title(title, fontsize=14)
-    plt.xlabel(xlabel, fontsize=12)
-    plt.ylabel(ylabel, fontsize=12)
-    plt.grid(True, linestyle='--', alpha=0.6)
-    plt.legend()
-    plt.tight_layout()
+    import matplotlib.pyplot as plt
+    import charts.heatmap
+
+    with stock_data.metrics.timer("render"):
+        plt.figure(figsize=(8, 7))
+        charts.heatmap.plot_heatmap(plt.gca(), matrix, labels, title)
+        plt.tight_layout()
+        plt.gcf().canvas.draw()  # matplotlib draws lazily, so do it here to count it as rendering
     plt.show()
 
 
-# The main function. Declared for ease and convention.
-def main() -> None:
-    # First run loading screen for flavour
+# Fetches daily closes for every ticker and lines them up on one trading calendar.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - start_date: First date wanted (inclusive).
+# - end_date: Last date wanted (exclusive).
+# - max_workers, timeout, source, batch_size: As for get_price_table.
+#
+# Returns (tickers, dates, prices) as from stock_data.correlation.align_closes:
+# one row per date and one column per ticker that had data.
+#
+def get_aligned_prices(tickers: list[str], start_date, end_date,
+                       max_workers: int = stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                       source: stock_data.sources.PriceSource = None,
+                       timeout: float = stock_data.concurrent_fetch.DEFAULT_TIMEOUT,
+                       batch_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE):
+    all_closes = _fetch_closes_concurrent(tickers, start_date, end_date, max_workers, timeout,
+                                          stock_data.concurrent_fetch.DEFAULT_RETRIES, None, source, batch_size)
+    return stock_data.correlation.align_closes({ticker: all_closes[ticker] for ticker in tickers
+                                                if ticker in all_closes})
+
+
+# Brings technical indicators (see stock_data.indicators) up to date with the
+# daily closes of a watchlist. When given the IndicatorSet of an earlier call,
+# only the days after the last one it saw are fetched and fed in, so a refresh
+# costs the same however much history is behind it.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - start_date: First date to warm new indicators up from (inclusive).
+# - end_date: Last date wanted (exclusive).
+# - indicators: IndicatorSet from an earlier call for the same tickers, or None
+#   to start a stock_data.indicators.default_indicators() set.
+# - max_workers, source, timeout, batch_size: As for get_price_table.
+#
+# Returns the updated IndicatorSet. Its "latest" dict holds the newest values,
+# one per ticker in the order of tickers (NaN for tickers with no data yet).
+#
+def update_indicators(tickers: list[str], start_date, end_date, indicators=None,
+                      max_workers: int = stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                      source: stock_data.sources.PriceSource = None,
+                      timeout: float = stock_data.concurrent_fetch.DEFAULT_TIMEOUT,
+                      batch_size: int = stock_data.price_cache.DEFAULT_CHUNK_SIZE):
+    tickers = list(dict.fromkeys(tickers))
+    if indicators is None:
+        indicators = stock_data.indicators.default_indicators(tickers)
+    elif indicators.names != tickers:
+        raise ValueError("The indicators were built for a different list of tickers.")
+    if indicators.last_date is not None:
+        start_date = max(start_date, (indicators.last_date + 1).astype(object))
+    if start_date >= end_date or not np.busday_count(start_date, end_date):
+        return indicators  # no trading days to add
+
+    found, dates, prices = get_aligned_prices(tickers, start_date, end_date, max_workers=max_workers, source=source,
+                                              timeout=timeout, batch_size=batch_size)
+    bars = np.full((len(dates), len(tickers)), np.nan)
+    bars[:, [tickers.index(ticker) for ticker in found]] = prices
+    with stock_data.metrics.timer("indicators"):
+        indicators.extend(dates, bars)
+    return indicators
+
 
-    widgets.loading_screen.run_loading_screen()
+# Writes one chart per ticker to image files, without opening any window.
+#
+# Parameters:
+# - tickers: List of stock tickers.
+# - out_dir: Folder the images are written to.
+# - formats: Image formats to write ("png", "svg" and/or "pdf").
+# - processes: Number of processes to spread the drawing over.
+# - source: Optional PriceSource to read from.
+# - start_date, end_date, period: Date range and sampling period (the last 12
+#   months of first-of-month prices when not given).
+#
+# Returns the paths of all files written.
+#
+def export_watchlist_charts(tickers: list[str], out_dir: str, formats=("png",), processes: int = 1,
+                            source: stock_data.sources.PriceSource = None, start_date=None, end_date=None,
+                            period: str = "monthly"):
+    import charts.export
+
+    default_start, default_end = _last_year_range()
+    table = get_price_table(tickers, start_date or default_start, end_date or default_end, period, source=source)
+
+    with stock_data.metrics.timer("render"):
+        paths = charts.export.export_charts(_table_charts(table, table.tickers, period), out_dir,
+                                            formats=formats, processes=processes)
+    stock_data.metrics.count("files_written", len(paths))
+    return paths
+
+
+# Turns every row of a PriceTable that has data into a chart dict for charts.export.
+def _table_charts(table, labels, period: str) -> list[dict]:
+    charts_to_render = []
+    for i, ticker in enumerate(table.tickers):
+        if not table.counts[i]:
+            continue
+        dates, prices = table.row(i)
+        charts_to_render.append({
+            "name": ticker,
+            "data": [prices],
+            "labels": [labels[i]],
+            "title": f"{labels[i]} Price From {dates[0]} To {dates[-1]}",
+            "xlabel": f"First Trading Day Of Each {_period_unit(period)}",
+            "ylabel": "Price of Stock (In USD)"})
+    return charts_to_render
+
+
+# Turns intraday closes into chart dicts for charts.export. Every line goes
+# through the fast path with LTTB downsampling, since a week of one-minute bars
+# is far more points than the image is wide.
+def _intraday_charts(all_closes: dict, labels: dict, interval: str) -> list[dict]:
+    return [{"name": ticker,
+             "data": [closes.to_numpy()],
+             "labels": [labels[ticker]],
+             "title": f"{labels[ticker]} Price From {closes.index[0]:%Y-%m-%d %H:%M} To {closes.index[-1]:%Y-%m-%d %H:%M}",
+             "xlabel": f"{INTERVAL_NAMES[interval]} Bars",
+             "ylabel": "Price of Stock (In USD)",
+             "fast": True,
+             "downsample": "lttb"}
+            for ticker, closes in all_closes.items()]
+
+
+# Returns "Week", "Month" or "Quarter" for a sampling period.
+def _period_unit(period: str) -> str:
+    return {"weekly": "Week", "monthly": "Month", "quarterly": "Quarter"}[period]
+
+
+# Number of periods predicted past the last price in show mode
+FORECAST_PERIODS = 3
+
+# Output modes of the command line
+OUTPUT_MODES = ("show", "export", "csv", "heatmap", "portfolio", "live", "indicators")
+
+# Bar sizes of the command line: daily bars sampled by --period, or intraday bars
+INTERVALS = ("1d", *stock_data.sources.INTRADAY_INTERVALS)
+
+# Names of the intraday bar sizes used in chart labels
+INTERVAL_NAMES = {"1m": "1-Minute", "5m": "5-Minute", "1h": "Hourly"}
 
-    # Prep for stock code
-    raw_stock_array : list[list] = []
-    stock_array : list[list] = []
 
-    # Example usage: fetch prices for Apple, Amazon, Google, and NVIDIA Corp
-    tickers = ["AAPL", "AMZN", "GOOG", "NVDA"]
+# Reads the command line options.
+def parse_args(argv=None):
+    default_start, default_end = _last_year_range()
+
+    parser = argparse.ArgumentParser(description="Track, chart and forecast a watchlist of stocks.")
+    tickers = parser.add_mutually_exclusive_group()
+    tickers.add_argument("--watchlist", help="file with one ticker per line (optionally 'TICKER, Label')")
+    tickers.add_argument("--tickers", nargs="+", help="tickers to track, e.g. --tickers AAPL MSFT")
+    parser.add_argument("--start", type=date.fromisoformat, default=default_start,
+                        help="first date, YYYY-MM-DD (default: 12 months ago)")
+    parser.add_argument("--end", type=date.fromisoformat,
+                        help="end date (not included), YYYY-MM-DD (default: today, or tomorrow for intraday bars)")
+    parser.add_argument("--period", choices=list(stock_data.resample.PERIODS), default="monthly",
+                        help="sample the first trading day of each week, month or quarter")
+    parser.add_argument("--interval", choices=INTERVALS, default="1d",
+                        help="bar size: 1d (sampled by --period) or 1m/5m/1h intraday bars, which are charted "
+                             "without sampling (default: 1d)")
+    parser.add_argument("--output", choices=OUTPUT_MODES, default="show",
+                        help="show a window, export image files, write CSV, show a heatmap of daily return "
+                             "correlations, value the holdings of --trades, watch live prices, or print "
+                             "technical indicators (default: show)")
+    parser.add_argument("--trades", help="CSV file of trades (date, ticker, quantity, optional price) "
+                                         "for the portfolio output")
+    parser.add_argument("--refresh", type=float, default=stock_data.sources.LIVE_INTERVAL,
+                        help="seconds between price polls for the live output "
+                             f"(default: {stock_data.sources.LIVE_INTERVAL:g})")
+    parser.add_argument("--capacity", type=int, default=stock_data.sources.LIVE_CAPACITY,
+                        help="newest prices shown per ticker for the live output "
+                             f"(default: {stock_data.sources.LIVE_CAPACITY})")
+    parser.add_argument("--indicator-state",
+                        help="file keeping the indicators between runs of the indicators output, so each run "
+                             "only fetches and adds the days since the last one")
+    parser.add_argument("--out-dir", default="charts_output", help="folder for exported images")
+    parser.add_argument("--formats", nargs="+", default=["png"], help="image formats to export (png, svg, pdf)")
+    parser.add_argument("--csv-file", default="-", help="file for CSV output ('-' for the terminal)")
+    parser.add_argument("--chunk-size", type=int, default=200,
+                        help="tickers processed together when exporting or writing CSV")
+    parser.add_argument("--workers", type=int, default=stock_data.concurrent_fetch.DEFAULT_MAX_WORKERS,
+                        help="batches of tickers fetched at the same time")
+    parser.add_argument("--batch-size", type=int, default=stock_data.price_cache.DEFAULT_CHUNK_SIZE,
+                        help="most tickers sent to the provider in one request")
+    parser.add_argument("--timeout", type=float, default=stock_data.concurrent_fetch.DEFAULT_TIMEOUT,
+                        help="seconds each batch may take to download, retries included")
+    parser.add_argument("--processes", type=int, default=1, help="processes used to draw exported images")
+    parser.add_argument("--no-loading-screen", action="store_true", help="skip the loading screen in show mode")
+    parser.add_argument("--metrics-log", help="append this run's stage timings and counters as a JSON line "
+                                              "to this file ('-' for stderr)")
+    parser.add_argument("--metrics-prom", help="write this run's stage timings and counters to this file "
+                                               "in the Prometheus text format")
+
+    args = parser.parse_args(argv)
+    if args.end is None:
+        # Intraday runs want today's bars too
+        args.end = default_end if args.interval == "1d" else default_end + timedelta(days=1)
+    if args.interval != "1d" and args.output in ("heatmap", "portfolio", "live", "indicators"):
+        parser.error("--interval only works with the show, export and csv outputs")
+    if args.refresh <= 0 or args.capacity < 1:
+        parser.error("--refresh must be positive and --capacity at least 1")
+    if args.output == "portfolio" and not args.trades:
+        parser.error("--output portfolio needs a --trades file")
+    if args.start >= args.end:
+        parser.error("--start must be before --end")
+    if args.batch_size < 1 or args.chunk_size < 1 or args.workers < 1:
+        parser.error("--batch-size, --chunk-size and --workers must be at least 1")
+    return args
+
+
+# Shows the whole watchlist in one interactive graph with a short forecast.
+def _show_watchlist(watchlist: list, args) -> None:
+    tickers = [ticker for ticker, _ in watchlist]
+    labels = dict(reversed(watchlist))
+
+    # Fetch all tickers at once in the background; any that fail are left out of the graph
+    progress = {"done": 0, "total": len(set(tickers))}
+    fetched = {}
+
+    def on_progress(done, total):
+        progress["done"], progress["total"] = done, total
+
+    def fetch():
+        fetched["table"] = get_price_table(tickers, args.start, args.end, args.period, max_workers=args.workers,
+                                           timeout=args.timeout, on_progress=on_progress, batch_size=args.batch_size)
+
+    fetch_thread = threading.Thread(target=fetch, daemon=True)
+    fetch_thread.start()
+
+    # Run the loading screen while the data comes in, and close it as soon as it's ready
+    if not args.no_loading_screen:
+        import widgets.loading_screen
+
+        widgets.loading_screen.run_loading_screen(is_done=lambda: not fetch_thread.is_alive(),
+                                                  get_progress=lambda: (progress["done"], progress["total"]))
+    fetch_thread.join()
+    if "table" not in fetched or not fetched["table"].has_data().any():
+        print("Could not fetch any stock data.")
+        return
+
+    # The prices are already plain float64 arrays, so each line is just a view into the table
+    plotted = fetched["table"].select(fetched["table"].has_data())
+    data = [plotted.row(i)[1] for i in range(len(plotted))]
+    plotted_labels = [labels[ticker] for ticker in plotted.tickers]
+
+    # Predict the next few periods for every ticker at once
+    forecasts = stock_data.forecast.forecast(plotted.prices, FORECAST_PERIODS, counts=plotted.counts)
+
+    draw_line_graph(data, labels=plotted_labels, title=f"Stock Prices Comparison From {args.start} To {args.end}",
+                    xlabel=f"First Trading Day Of Each {_period_unit(args.period)}",
+                    ylabel="Price of Stock (In USD)", forecasts=list(forecasts))
+
+
+# Shows the intraday bars of the whole watchlist in one graph.
+def _show_intraday(watchlist: list, args) -> None:
+    labels = dict(reversed(watchlist))
+    all_closes = get_intraday_closes(list(dict.fromkeys(ticker for ticker, _ in watchlist)), args.start, args.end,
+                                     args.interval, chunk_size=args.batch_size)
+    if not all_closes:
+        print("Could not fetch any stock data.")
+        return
+
+    draw_line_graph([closes.to_numpy() for closes in all_closes.values()], [labels[ticker] for ticker in all_closes],
+                    title=f"Intraday Stock Prices From {args.start} To {args.end}",
+                    xlabel=f"{INTERVAL_NAMES[args.interval]} Bars", ylabel="Price of Stock (In USD)",
+                    fast=True, downsample="lttb")
+
+
+# Yields the charts to export for each chunk of the watchlist.
+def _iter_chunk_charts(watchlist, args):
+    if args.interval == "1d":
+        for table, labels in iter_price_tables(watchlist, args.start, args.end, args.period, args.chunk_size,
+                                               max_workers=args.workers, timeout=args.timeout,
+                                               batch_size=args.batch_size):
+            yield _table_charts(table, labels, args.period)
+        return
+
+    for chunk in stock_data.watchlist.chunked(watchlist, args.chunk_size):
+        labels = dict(reversed(chunk))
+        all_closes = get_intraday_closes([ticker for ticker, _ in chunk], args.start, args.end, args.interval,
+                                         chunk_size=args.batch_size)
+        yield _intraday_charts(all_closes, labels, args.interval)
+
+
+# Exports one image per ticker, one chunk of the watchlist at a time.
+def _export_watchlist(watchlist, args) -> None:
+    import charts.export
+
+    written = 0
+    for charts_to_render in _iter_chunk_charts(watchlist, args):
+        with stock_data.metrics.timer("render"):
+            paths = charts.export.export_charts(charts_to_render, args.out_dir,
+                                                formats=args.formats, processes=args.processes)
+        stock_data.metrics.count("files_written", len(paths))
+        written += len(paths)
+        print(f"Exported {written} files to {args.out_dir}")
+
+
+# Writes "ticker,date,price" rows for the watchlist, one chunk at a time.
+def _write_csv(watchlist, args) -> None:
+    out = sys.stdout if args.csv_file == "-" else open(args.csv_file, "w", newline="", encoding="utf-8")
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["ticker", "date", "price"])
+        if args.interval != "1d":
+            # Intraday rows carry the bar's timestamp instead of a date
+            for chunk in stock_data.watchlist.chunked(watchlist, args.chunk_size):
+                all_closes = get_intraday_closes([ticker for ticker, _ in chunk], args.start, args.end, args.interval,
+                                                 chunk_size=args.batch_size)
+                for ticker, closes in all_closes.items():
+                    writer.writerows(zip([ticker] * len(closes), closes.index.map(datetime.isoformat),
+                                         closes.round(4).tolist()))
+            return
+
+        for table, _ in iter_price_tables(watchlist, args.start, args.end, args.period, args.chunk_size,
+                                          max_workers=args.workers, timeout=args.timeout,
+                                          batch_size=args.batch_size):
+            for i, ticker in enumerate(table.tickers):
+                dates, prices = table.row(i)
+                writer.writerows(zip([ticker] * len(dates), dates.astype(str), prices.tolist()))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+# Shows how closely the daily returns of the watchlist move together, and
+# prints the worst drawdown of each ticker.
+def _show_correlations(watchlist: list, args) -> None:
+    labels = dict(reversed(watchlist))
+    tickers = list(dict.fromkeys(ticker for ticker, _ in watchlist))
+    tickers, _, prices = get_aligned_prices(tickers, args.start, args.end, max_workers=args.workers,
+                                            timeout=args.timeout, batch_size=args.batch_size)
+    if len(tickers) < 2:
+        print("Need at least two tickers with data to compare.")
+        return
+
+    returns = stock_data.correlation.returns_matrix(prices)
+    correlations = stock_data.correlation.correlation_matrix(returns)
+    for ticker, drawdown in zip(tickers, stock_data.correlation.max_drawdowns(prices)):
+        print(f"{labels[ticker]}: worst drawdown {drawdown:.1%}")
+
+    draw_heatmap(correlations, [labels[ticker] for ticker in tickers],
+                 title=f"Daily Return Correlations From {args.start} To {args.end}")
+
+
+# Values the holdings built up by a trades file on every trading day, prints
+# where each position stands at the end, and shows the portfolio's value.
+def _show_portfolio(args) -> None:
+    trades = stock_data.portfolio.read_trades(args.trades)
+    tickers, dates, prices = get_aligned_prices(list(dict.fromkeys(trades["ticker"])), args.start, args.end,
+                                                max_workers=args.workers, timeout=args.timeout,
+                                                batch_size=args.batch_size)
+    if not tickers:
+        print("Could not fetch any stock data.")
+        return
+
+    try:
+        valuation = stock_data.portfolio.value_portfolio(tickers, dates, prices, trades)
+    except ValueError as error:
+        print(f"Could not value the portfolio: {error}")
+        return
+
+    unrealized = valuation.unrealized_pnl()[-1]
+    print(f"Positions on {dates[-1]}:")
+    for i, ticker in enumerate(tickers):
+        print(f"{ticker}: {valuation.shares[-1, i]:g} shares worth {valuation.market_value[-1, i]:.2f}, "
+              f"cost {valuation.cost_basis[-1, i]:.2f}, unrealized P&L {unrealized[i]:.2f}, "
+              f"realized P&L {valuation.realized_pnl[-1, i]:.2f}")
+
+    value = valuation.portfolio_value()
+    returns = valuation.time_weighted_return()
+    print(f"Portfolio value {value[-1]:.2f}, total P&L {valuation.total_pnl()[-1].sum():.2f}, "
+          f"time-weighted return {returns[-1]:.1%}")
+
+    draw_line_graph([value], ["Portfolio"], title=f"Portfolio Value From {dates[0]} To {dates[-1]}",
+                    xlabel="Trading Days", ylabel="Value (In USD)", fast=True, value_labels="ends")
+
+
+# Brings the watchlist's technical indicators up to date (carrying on from
+# --indicator-state when it exists) and prints the newest value of each.
+def _show_indicators(watchlist: list, args) -> None:
+    labels = dict(reversed(watchlist))
+    tickers = list(dict.fromkeys(ticker for ticker, _ in watchlist))
+
+    indicators = None
+    if args.indicator_state and os.path.exists(args.indicator_state):
+        indicators = stock_data.indicators.IndicatorSet.load(args.indicator_state)
+        if indicators.names != tickers:
+            print(f"{args.indicator_state} was saved for other tickers, starting over.")
+            indicators = None
+
+    indicators = update_indicators(tickers, args.start, args.end, indicators, max_workers=args.workers,
+                                   timeout=args.timeout, batch_size=args.batch_size)
+    if args.indicator_state:
+        indicators.save(args.indicator_state)
+    if indicators.last_date is None:
+        print("Could not fetch any stock data.")
+        return
+
+    latest = indicators.latest
+    lower, _, upper = latest["bollinger"]
+    macd, signal, _ = latest["macd"]
+    print(f"Indicators on {indicators.last_date}:")
+    for i, ticker in enumerate(tickers):
+        print(f"{labels[ticker]}: SMA {latest['sma'][i]:.2f}, EMA {latest['ema'][i]:.2f}, "
+              f"RSI {latest['rsi'][i]:.1f}, MACD {macd[i]:.2f} (signal {signal[i]:.2f}), "
+              f"Bollinger {lower[i]:.2f}-{upper[i]:.2f}, volatility {latest['volatility'][i]:.1%}")
+
+
+# The main function. Declared for ease and convention.
+def main(argv=None) -> None:
+    args = parse_args(argv)
 
-    for t in tickers:
-        raw_stock_array.append(get_first_of_month_prices(t))
+    # Pick the watchlist: a file (read lazily), tickers from the command line, or the example tickers
+    if args.watchlist:
+        watchlist = stock_data.watchlist.read_watchlist(args.watchlist)
+    elif args.tickers:
+        watchlist = stock_data.watchlist.from_tickers(args.tickers)
+    else:
+        watchlist = iter(stock_data.watchlist.DEFAULT_WATCHLIST)
 
-    # Converts the finance "float" values into standard plottable float values
-    ticker_count = len(raw_stock_array)
-    for i in range(ticker_count):
-        price_list = []
-        for unfloated_price_value in raw_stock_array[i][2]:
-            floated_price_value = unfloated_price_value.iloc[0]
-            price_list.append(floated_price_value)
-        stock_array.append([raw_stock_array[i][0],price_list])
+    # Pick where the stage timings and counters go at the end of the run
+    sinks = []
+    if args.metrics_log:
+        sinks.append(stock_data.metrics.JsonLogSink(args.metrics_log))
+    if args.metrics_prom:
+        sinks.append(stock_data.metrics.PrometheusFileSink(args.metrics_prom))
 
-    # Data for the line graph (Last 12 months of stocks for 4 chosen companies)
-    line1 = stock_array[0][1]
-    line2 = stock_array[1][1]
-    line3 = stock_array[2][1]
-    line4 = stock_array[3][1]
+    try:
+        if args.output == "show" and args.interval != "1d":
+            _show_intraday(list(watchlist), args)
+        elif args.output == "show":
+            _show_watchlist(list(watchlist), args)
+        elif args.output == "export":
+            _export_watchlist(watchlist, args)
+        elif args.output == "heatmap":
+            _show_correlations(list(watchlist), args)
+        elif args.output == "portfolio":
+            _show_portfolio(args)
+        elif args.output == "indicators":
+            _show_indicators(list(watchlist), args)
+        elif args.output == "live":
+            import charts.live_chart
 
-    data = [line1, line2, line3, line4]
-    labels = ["Apple (AAPL)", "Amazon (AMZN)", "Alphabet Inc. (GOOG)", "NVIDIA Corp (NVDA)"]
+            charts.live_chart.run_live_chart(list(dict.fromkeys(ticker for ticker, _ in watchlist)),
+                                             interval=args.refresh, capacity=args.capacity)
+        else:
+            _write_csv(watchlist, args)
+    finally:
+        stock_data.metrics.METRICS.flush(sinks)
 
-    draw_line_graph(data, labels=labels, title="Stock Prices Comparison For The Last Year", xlabel="Last 12 Months", ylabel="Price of Stock (In USD)")
-    
     return
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,7 @@
+# Lets the tests import the tracker's packages (stock_data, charts, widgets)
+# whichever folder pytest is started from.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,23 @@
+# Tests for the bar visualizer (widgets/bar_visualizer.py).
+
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from widgets.bar_visualizer import AudioLevels, BarVisualizer
+
+
+def test_bars_fill_from_the_left():
+    bars = BarVisualizer(10, max_height=100, min_height=5)
+    bars.set_progress(3, 10)
+    bars.snap()
+    assert bars.heights.tolist() == [100] * 3 + [5] * 7
+
+
+def test_audio_levels_find_the_loud_band():
+    sample_rate = 22050
+    tone = np.sin(2 * np.pi * 2000 * np.arange(sample_rate) / sample_rate)
+    levels = AudioLevels.from_samples(tone, sample_rate, bands=8)
+    assert levels.levels.shape[0] == 60
+    assert np.all(levels.at(0.5).argmax() == levels.levels.argmax(axis=1))
@@ -0,0 +1,32 @@
+# Tests for the high-volume drawing path (charts/fast_render.py).
+
+import numpy as np
+
+import charts.fast_render
+
+
+def _ragged_rows():
+    rng = np.random.default_rng(0)
+    return charts.fast_render._stack([np.cumsum(rng.normal(size=5000)), np.cumsum(rng.normal(size=3000))])
+
+
+def test_lttb_ends_every_row_on_its_last_value():
+    values = _ragged_rows()
+    x, y = charts.fast_render.decimate_lttb(values, 500)
+
+    for row, last in ((0, 4999), (1, 2999)):
+        drawn = ~np.isnan(y[row])
+        assert x[row][drawn][-1] == last
+        assert y[row][drawn][-1] == values[row, last]
+        assert x[row][drawn][0] == 0
+        assert (np.diff(x[row]) >= 0).all()
+        assert drawn.sum() <= 500
+
+
+def test_minmax_keeps_the_end_of_shorter_rows():
+    values = _ragged_rows()
+    x, y = charts.fast_render.decimate_minmax(values, 250)
+
+    drawn = ~np.isnan(y[1])
+    assert 2999 - x[1][drawn][-1] < 5000 / 250
+    assert (np.diff(x[1]) >= 0).all()
@@ -0,0 +1,93 @@
+# Tests for the incremental technical indicators (stock_data/indicators.py)
+# and the refresh that keeps them up to date (stock_nums.update_indicators).
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import stock_data.indicators
+import stock_nums
+from stock_data.sources import PriceSource
+
+
+def _prices(tickers: int = 3, bars: int = 300) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(tickers, bars)), axis=1))
+
+
+def _frame(prices: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(prices.T)
+
+
+def test_moving_averages_match_pandas():
+    prices = _prices()
+    frame = _frame(prices)
+
+    sma = stock_data.indicators.SMA(3, 20).run(prices)
+    ema = stock_data.indicators.EMA(3, 20).run(prices)
+
+    assert np.allclose(sma.T, frame.rolling(20).mean(), equal_nan=True)
+    assert np.allclose(ema.T, frame.ewm(span=20, adjust=False).mean())
+
+
+def test_macd_matches_pandas():
+    prices = _prices()
+    frame = _frame(prices)
+
+    macd, signal, histogram = stock_data.indicators.MACD(3).run(prices)
+
+    expected = frame.ewm(span=12, adjust=False).mean() - frame.ewm(span=26, adjust=False).mean()
+    expected_signal = expected.ewm(span=9, adjust=False).mean()
+    assert np.allclose(macd.T, expected)
+    assert np.allclose(signal.T, expected_signal)
+    assert np.allclose(histogram.T, expected - expected_signal)
+
+
+def test_bollinger_bands_and_volatility_match_pandas():
+    prices = _prices()
+    frame = _frame(prices)
+
+    lower, middle, upper = stock_data.indicators.BollingerBands(3, 20, 2.0).run(prices)
+    volatility = stock_data.indicators.Volatility(3, 20).run(prices)
+
+    std = frame.rolling(20).std(ddof=0)
+    assert np.allclose(middle.T, frame.rolling(20).mean(), equal_nan=True)
+    assert np.allclose(lower.T, frame.rolling(20).mean() - 2 * std, equal_nan=True)
+    assert np.allclose(upper.T, frame.rolling(20).mean() + 2 * std, equal_nan=True)
+    log_returns = np.log(frame / frame.shift())
+    assert np.allclose(volatility.T, log_returns.rolling(20).std(ddof=0) * np.sqrt(252), equal_nan=True)
+
+
+# Serves the same random walk for every request and records the requested ranges.
+class WalkSource(PriceSource):
+    cacheable = False
+
+    def __init__(self, days):
+        self.closes = pd.Series(_prices(1, len(days))[0], index=days)
+        self.requests = []
+
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        self.requests.append((ticker, start, end))
+        closes = self.closes * (2 if ticker == "BBB" else 1)
+        return closes[(closes.index >= pd.Timestamp(start)) & (closes.index < pd.Timestamp(end))]
+
+
+def test_refresh_only_fetches_and_adds_the_new_days(tmp_path):
+    days = pd.bdate_range("2025-01-01", periods=300)
+    source = WalkSource(days)
+    start, middle, end = date(2025, 1, 1), days[250].date(), (days[-1] + pd.Timedelta(days=1)).date()
+
+    indicators = stock_nums.update_indicators(["AAA", "BBB"], start, middle, source=source)
+    path = str(tmp_path / "indicators.pickle")
+    indicators.save(path)
+    source.requests.clear()
+    refreshed = stock_nums.update_indicators(["AAA", "BBB"], start, end,
+                                             stock_data.indicators.IndicatorSet.load(path), source=source)
+
+    assert {request[1] for request in source.requests} == {middle}
+    assert refreshed.last_date == np.datetime64(days[-1].date())
+
+    everything = stock_nums.update_indicators(["AAA", "BBB"], start, end, source=source)
+    for name, value in everything.latest.items():
+        assert np.allclose(refreshed.latest[name], value), name
@@ -0,0 +1,22 @@
+# Tests for the line graph drawing code (charts/line_graph.py).
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import charts.line_graph
+
+
+def test_fast_path_keeps_forecasts_inside_the_axes():
+    figure, axes = plt.subplots()
+    data = [np.linspace(100, 120, 2500), np.linspace(50, 60, 2500)]
+    forecasts = [np.array([130.0, 140.0, 150.0]), np.array([40.0, 30.0, 20.0])]
+    charts.line_graph.plot_lines(axes, data, ["A", "B"], "Title", "X", "Y", fast=True, forecasts=forecasts)
+
+    assert axes.get_xlim()[1] >= 2502
+    low, high = axes.get_ylim()
+    assert low < 20 and high > 150
+    plt.close(figure)
@@ -0,0 +1,27 @@
+# Tests for the portfolio valuation engine (stock_data/portfolio.py).
+
+import numpy as np
+import pandas as pd
+
+import stock_data.portfolio
+
+
+def test_value_portfolio_follows_average_cost():
+    dates = pd.bdate_range("2026-01-05", periods=6).to_numpy().astype("datetime64[D]")
+    prices = np.array([[10.0, 100.0], [11, 100], [12, 100], [13, 100], [14, 100], [15, 100]])
+    trades = pd.DataFrame({
+        "date": pd.to_datetime(["2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08", "2026-01-09"]),
+        "ticker": ["AAA", "AAA", "AAA", "AAA", "AAA"],
+        "quantity": [10.0, 10.0, -5.0, -15.0, 4.0],
+        "price": [10.0, 12.0, 14.0, np.nan, 14.0],
+    })
+    valuation = stock_data.portfolio.value_portfolio(["AAA", "BBB"], dates, prices, trades)
+
+    assert valuation.shares[:, 0].tolist() == [10, 20, 15, 0, 4, 4]
+    # Average cost 11 after the second buy, so selling 5 at 14 locks in 15, and
+    # selling the last 15 at the close of 13 locks in another 30
+    assert np.allclose(valuation.cost_basis[:, 0], [100, 220, 165, 0, 56, 56])
+    assert np.allclose(valuation.realized_pnl[:, 0], [0, 0, 15, 45, 45, 45])
+    assert np.allclose(valuation.market_value[:, 0], [100, 220, 180, 0, 56, 60])
+    assert not valuation.shares[:, 1].any()
+    assert np.allclose(valuation.net_flows, [100, 120, -70, -195, 56, 0])
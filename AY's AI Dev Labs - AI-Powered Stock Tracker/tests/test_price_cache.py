@@ -0,0 +1,103 @@
+# Tests for the incremental top-up of the price cache (stock_data/price_cache.py).
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import stock_data.price_cache
+from stock_data.scheduler import FetchScheduler
+from stock_data.sources import PriceSource
+
+
+# A weekday the fake market is closed
+HOLIDAY = date(2026, 9, 7)
+
+
+# Serves a close for every weekday except HOLIDAY, and counts its requests.
+class HolidaySource(PriceSource):
+    def __init__(self):
+        self.requests = []
+
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        self.requests.append((ticker, start, end))
+        days = pd.bdate_range(start, end, inclusive="left")
+        days = days[days != pd.Timestamp(HOLIDAY)]
+        return pd.Series(100.0 + pd.RangeIndex(len(days)), index=days, dtype=float)
+
+
+# Always fails, like a provider that is rate limiting every request.
+class FailingSource(PriceSource):
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        raise ConnectionError("rate limited")
+
+
+def _scheduler(source):
+    return FetchScheduler(source, rate=1000, burst=1000, backoff=0, max_backoff=0)
+
+
+def test_top_up_over_a_holiday_keeps_the_cached_closes(tmp_path):
+    source = HolidaySource()
+    scheduler = _scheduler(source)
+    start = date(2025, 9, 1)
+
+    first = stock_data.price_cache.get_daily_closes("AAPL", start, HOLIDAY, cache_dir=str(tmp_path), source=scheduler)
+    topped_up = stock_data.price_cache.get_daily_closes("AAPL", start, date(2026, 9, 8), cache_dir=str(tmp_path),
+                                                        source=scheduler)
+
+    assert len(first) > 250
+    assert topped_up.equals(first)
+    assert source.requests[-1] == ("AAPL", HOLIDAY, date(2026, 9, 8))
+    assert not scheduler.failed
+
+
+def test_failed_top_up_returns_the_cached_closes(tmp_path):
+    start, end = date(2026, 1, 5), date(2026, 3, 2)
+    cached = stock_data.price_cache.get_daily_closes("MSFT", start, end, cache_dir=str(tmp_path),
+                                                     source=HolidaySource())
+
+    closes = stock_data.price_cache.get_daily_closes("MSFT", start, date(2026, 3, 16), cache_dir=str(tmp_path),
+                                                     source=_scheduler(FailingSource()))
+    assert closes.equals(cached)
+
+    # The gap stays uncovered, so the next run asks for it again
+    source = HolidaySource()
+    stock_data.price_cache.get_daily_closes("MSFT", start, date(2026, 3, 16), cache_dir=str(tmp_path), source=source)
+    assert source.requests == [("MSFT", end, date(2026, 3, 16))]
+
+
+def test_failed_download_with_nothing_cached_raises(tmp_path):
+    with pytest.raises(ConnectionError):
+        stock_data.price_cache.get_daily_closes("IBM", date(2026, 1, 5), date(2026, 3, 2), cache_dir=str(tmp_path),
+                                                source=_scheduler(FailingSource()))
+    with pytest.raises(ConnectionError):
+        stock_data.price_cache.get_daily_closes_batch(["IBM", "ORCL"], date(2026, 1, 5), date(2026, 3, 2),
+                                                      cache_dir=str(tmp_path), source=_scheduler(FailingSource()))
+
+
+def test_range_after_the_cached_one_fetches_the_days_between(tmp_path):
+    source = HolidaySource()
+    stock_data.price_cache.get_daily_closes("NVDA", date(2024, 1, 1), date(2024, 3, 1), cache_dir=str(tmp_path),
+                                            source=source)
+    stock_data.price_cache.get_daily_closes("NVDA", date(2024, 6, 3), date(2024, 8, 1), cache_dir=str(tmp_path),
+                                            source=source)
+    april = stock_data.price_cache.get_daily_closes("NVDA", date(2024, 4, 1), date(2024, 5, 1),
+                                                    cache_dir=str(tmp_path), source=source)
+
+    assert source.requests[1] == ("NVDA", date(2024, 3, 1), date(2024, 8, 1))
+    assert len(source.requests) == 2
+    assert len(april) == 22
+
+
+def test_range_before_the_cached_one_fetches_the_days_between(tmp_path):
+    source = HolidaySource()
+    stock_data.price_cache.get_daily_closes("AMD", date(2024, 6, 3), date(2024, 8, 1), cache_dir=str(tmp_path),
+                                            source=source)
+    stock_data.price_cache.get_daily_closes("AMD", date(2024, 1, 1), date(2024, 3, 1), cache_dir=str(tmp_path),
+                                            source=source)
+    april = stock_data.price_cache.get_daily_closes("AMD", date(2024, 4, 1), date(2024, 5, 1),
+                                                    cache_dir=str(tmp_path), source=source)
+
+    assert source.requests[1] == ("AMD", date(2024, 1, 1), date(2024, 6, 3))
+    assert len(source.requests) == 2
+    assert len(april) == 22
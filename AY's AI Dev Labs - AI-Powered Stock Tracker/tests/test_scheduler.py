@@ -0,0 +1,56 @@
+# Tests for the rate-limited fetch scheduler (stock_data/scheduler.py).
+
+import time
+from datetime import date
+
+import pandas as pd
+
+from stock_data.scheduler import FetchScheduler
+from stock_data.sources import PriceSource
+
+
+# Fails every request until "healthy" is set, then answers slowly.
+class FlakySource(PriceSource):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.healthy = False
+
+    def get_daily_closes(self, ticker: str, start: date, end: date) -> pd.Series:
+        if not self.healthy:
+            raise ConnectionError("rate limited")
+        time.sleep(self.delay)
+        return pd.Series([1.0], index=pd.to_datetime([start]))
+
+
+def test_retry_failed_is_bounded_by_the_timeout():
+    source = FlakySource(delay=0.5)
+    scheduler = FetchScheduler(source, rate=1000, burst=1000, retries=0)
+    tickers = [f"T{i}" for i in range(40)]
+    for ticker in tickers:
+        try:
+            scheduler.get_daily_closes(ticker, date(2026, 1, 5), date(2026, 1, 9))
+        except ConnectionError:
+            pass
+    assert len(scheduler.failed) == len(tickers)
+
+    # One at a time these would take 20 seconds
+    source.healthy = True
+    started = time.monotonic()
+    recovered = scheduler.retry_failed(max_workers=4, time_limit=0.2)
+    assert time.monotonic() - started < 1
+    assert recovered == 0
+    assert len(scheduler.failed) == len(tickers)
+
+
+def test_retry_failed_hands_recovered_answers_out_once():
+    source = FlakySource(delay=0)
+    scheduler = FetchScheduler(source, rate=1000, burst=1000, retries=0)
+    try:
+        scheduler.get_daily_closes("AAPL", date(2026, 1, 5), date(2026, 1, 9))
+    except ConnectionError:
+        pass
+
+    source.healthy = True
+    assert scheduler.retry_failed() == 1
+    assert not scheduler.failed
+    assert len(scheduler.get_daily_closes("AAPL", date(2026, 1, 5), date(2026, 1, 9))) == 1
@@ -0,0 +1,153 @@
+# This module draws a row of animated bars, like a music equalizer.
+#
+# The heights, target heights and colours of all bars are NumPy arrays, so
+# moving every bar towards its target is one array operation per frame, and
+# hundreds of bars cost about the same as a handful. The targets can come from:
+# - set_progress(): bars fill up from the left as work gets done
+# - set_levels(): any list of 0-1 levels, such as AudioLevels from a music track
+# - set_wave(): each bar bobbing on its own sine wave
+# - randomize(): random heights
+#
+# Used by the stock tracker's loading screen and by Palismanto's main menu,
+# which imports it from this folder (see Palismanto's screens/screens.py).
+
+import numpy as np
+import pygame
+
+
+# Returns count random bright colours as a (count, 3) array.
+def random_colors(count: int) -> np.ndarray:
+    return np.random.randint(50, 256, size=(count, 3)).astype(np.uint8)
+
+
+# Bar Visualizer Class
+#
+# Parameters:
+# - count: Number of bars.
+# - max_height, min_height: Tallest and shortest bar in pixels.
+# - colors: Optional (count, 3) array of RGB colours (random when not given).
+# - speed: Fraction of the way to its target a bar moves each frame at 60 fps.
+#
+class BarVisualizer:
+    def __init__(self, count: int, max_height: float, min_height: float = 0, colors=None, speed: float = 0.05):
+        self.max_height = max_height
+        self.min_height = min_height
+        self.speed = speed
+        self.heights = np.full(count, float(min_height))
+        self.targets = np.full(count, float(min_height))
+        self.colors = random_colors(count) if colors is None else np.asarray(colors, dtype=np.uint8)
+        self._color_tuples = [tuple(color) for color in self.colors.tolist()]
+        self._index = np.arange(count)
+
+    def __len__(self) -> int:
+        return len(self.heights)
+
+    # Sets the targets from levels between 0 and 1. Any number of levels is
+    # stretched (or squeezed) to the number of bars.
+    def set_levels(self, levels) -> None:
+        levels = np.clip(np.asarray(levels, dtype=np.float64), 0.0, 1.0)
+        if len(levels) != len(self):
+            levels = np.interp(np.linspace(0, len(levels) - 1, len(self)), np.arange(len(levels)), levels)
+        self.targets = self.min_height + levels * (self.max_height - self.min_height)
+
+    # Fills the bars from the left in proportion to done / total.
+    def set_progress(self, done: int, total: int) -> None:
+        filled = len(self) if total <= 0 else int(len(self) * done / total)
+        self.targets = np.where(self._index < filled, float(self.max_height), float(self.min_height))
+
+    # Sets every bar to its own point on a sine wave at time t.
+    def set_wave(self, t: float, phases, speeds) -> None:
+        self.set_levels((np.sin(t * np.asarray(speeds) + np.asarray(phases)) + 1) / 2)
+
+    # Gives every bar a random target between low and high pixels.
+    def randomize(self, low: float = None, high: float = None) -> None:
+        low = self.min_height if low is None else low
+        high = self.max_height if high is None else high
+        self.targets = np.random.uniform(low, high, size=len(self))
+
+    # Jumps every bar straight to its target.
+    def snap(self) -> None:
+        self.heights = self.targets.copy()
+
+    # Moves every bar towards its target by dt seconds (one 60 fps frame if not given).
+    def update(self, dt: float = None) -> None:
+        frames = 1.0 if dt is None else dt * 60
+        self.heights += (self.targets - self.heights) * (1 - (1 - self.speed) ** frames)
+
+    # Draws the bars standing on a baseline.
+    #
+    # Parameters:
+    # - surface: The surface to draw on.
+    # - left: X position of the first bar.
+    # - bottom: Y position of the baseline.
+    # - pitch: Distance from the start of one bar to the start of the next.
+    # - gap: Empty pixels between neighbouring bars (taken out of pitch).
+    #
+    def draw(self, surface: pygame.Surface, left: int, bottom: int, pitch: int, gap: int = 2) -> None:
+        heights = self.heights.astype(np.int64)
+        xs = left + self._index * pitch
+        width = max(1, pitch - gap)
+        for x, height, color in zip(xs.tolist(), heights.tolist(), self._color_tuples):
+            if height > 0:
+                surface.fill(color, (x, bottom - height, width, height))
+
+
+# Loudness of a music track over time, split into frequency bands.
+#
+# Parameters:
+# - levels: Array of shape (frames, bands) with values between 0 and 1.
+# - fps: Frames per second of levels.
+#
+class AudioLevels:
+    def __init__(self, levels: np.ndarray, fps: int = 60):
+        self.levels = levels
+        self.fps = fps
+
+    # Analyses raw samples: one FFT per frame, summed into log-spaced frequency
+    # bands and scaled so 0 is 60 dB below the loudest band and 1 is the loudest.
+    #
+    # Parameters:
+    # - samples: Array of shape (samples,) or (samples, channels).
+    # - sample_rate: Samples per second.
+    # - bands: Wanted number of bands (very low bands may be merged, leaving fewer).
+    # - fps: Frames per second to analyse.
+    #
+    @classmethod
+    def from_samples(cls, samples, sample_rate: int, bands: int, fps: int = 60):
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 2:
+            samples = samples.mean(axis=1)
+
+        frame_size = max(2, sample_rate // fps)
+        frames = len(samples) // frame_size
+        if frames == 0:
+            raise ValueError("The track is too short to analyse.")
+        blocks = samples[:frames * frame_size].reshape(frames, frame_size) * np.hanning(frame_size).astype(np.float32)
+        spectrum = np.abs(np.fft.rfft(blocks, axis=1))
+
+        # Log-spaced band edges, skipping the DC bin
+        edges = np.unique(np.geomspace(1, spectrum.shape[1], bands + 1).astype(np.int64))
+        band_sums = np.add.reduceat(spectrum, edges[:-1], axis=1)
+        band_power = band_sums / np.diff(edges)
+
+        decibels = 20 * np.log10(band_power + 1e-9)
+        levels = np.clip((decibels - decibels.max() + 60) / 60, 0.0, 1.0)
+        return cls(levels.astype(np.float32), fps)
+
+    # Loads and analyses an audio file with pygame.mixer (MP3, OGG or WAV).
+    # Returns None when the file can't be decoded here, so callers can fall back
+    # to another animation.
+    @classmethod
+    def from_file(cls, path: str, bands: int, fps: int = 60):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sample_rate = pygame.mixer.get_init()[0]
+            samples = pygame.sndarray.array(pygame.mixer.Sound(path))
+        except Exception:
+            return None
+        return cls.from_samples(samples, sample_rate, bands, fps)
+
+    # Returns the band levels at a playback position in seconds (the track loops).
+    def at(self, seconds: float) -> np.ndarray:
+        return self.levels[int(seconds * self.fps) % len(self.levels)]
@@ -1,214 +1,212 @@
 #This program is used to run the loading screen
+#
+# The loading screen is a LoadingScreen object that any pygame loop can drive:
+# call update(dt) and draw(surface) once per frame and check done. It has the
+# same handle_event/update/draw methods as a Palismanto screen, so it can also
+# be handed to a ScreenManager. run_loading_screen() is the standalone version
+# that opens its own window and runs the loop itself.
 
 
 import pygame
-import sys
+import os
 import random
-import math
-import time
 
-def run_loading_screen():
-    #Initializes Pygame
-    pygame.init()
-
-    #Screen settings
-    WIDTH, HEIGHT = 1000, 600
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Now Loading...")
+import widgets.bar_visualizer
+import widgets.messages
+import widgets.render_cache
+
+
+# Size of the standalone window opened by run_loading_screen
+WIDTH, HEIGHT = 1000, 600
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# How long the screen plays when there is nothing to wait for (seconds)
+DEFAULT_DURATION = 5
+
+# Seconds between new messages/colors, and between new random bar heights
+CHANGE_INTERVAL = 2.0
+
+# The square turns 2 degrees per frame at 60 frames per second
+ROTATION_SPEED = 120  # degrees per second
+
+# Smooth animation speed
+SPEED = 0.05  # 0.0–1.0 per frame at 60 fps, larger = faster motion
+
+# Bar graph settings
+NUM_BARS = 40
+MAX_BAR_HEIGHT = 160
+MIN_BAR_HEIGHT = 5
+
+# The lab logo, next to this file
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lab_logo.png")
+
+
+# Loading Screen Class
+#
+# Parameters:
+# - is_done: Optional function returning True once the background work is finished.
+#   Without it the screen simply plays for a fixed DEFAULT_DURATION seconds.
+# - get_progress: Optional function returning (done, total), polled every update.
+#   Progress can also be pushed with set_progress() instead.
+# - min_duration: Minimum time in seconds to show the screen when is_done is given.
+# - on_finished: Optional function called once when the screen is done (e.g. to
+#   make a ScreenManager go to the next screen).
+# - messages: Optional widgets.messages.MessageProvider (for a custom message pack).
+#
+# pygame (and its font module) must already be initialised by the host.
+#
+class LoadingScreen:
+    def __init__(self, is_done=None, get_progress=None, min_duration: float = 1.0, on_finished=None,
+                 messages: widgets.messages.MessageProvider = None):
+        self.is_done = is_done
+        self.get_progress = get_progress
+        self.min_duration = min_duration
+        self.on_finished = on_finished
+        self.messages = messages if messages is not None else widgets.messages.MessageProvider()
+        self.done = False
+        self.elapsed = 0.0
+
+        # Text setup (rendered again only when the message or its color changes)
+        self.text = "Booting up system. Please wait..."
+        self.message_text = widgets.render_cache.CachedText(pygame.font.Font(None, 32))
+        self.progress_text = widgets.render_cache.CachedText(pygame.font.Font(None, 28))
+        self.progress = None  # (done, total) once known
+
+        # Square setup (every angle's corners are worked out once, up front)
+        self.angle = 0.0
+        self.square_frames = widgets.render_cache.SquareFrames(100, step=2)
+
+        # Flashing text & color timing
+        self.color_timer = 0.0
+        self.current_color = WHITE
+
+        # Create bar data
+        self.bars = widgets.bar_visualizer.BarVisualizer(NUM_BARS, MAX_BAR_HEIGHT, MIN_BAR_HEIGHT, speed=SPEED)
+        self.bars.randomize(20, MAX_BAR_HEIGHT)
+        self.bars.snap()
+        self.bars.randomize()
+
+        # Timer to pick new targets for bars
+        self.bar_timer = 0.0
+
+        # Load the image and set it
+        self.image = pygame.transform.scale(pygame.image.load(LOGO_PATH), (288.5, 27))
+
+    # Sets how much of the work is finished, for hosts that push progress.
+    def set_progress(self, done: int, total: int) -> None:
+        self.progress = (done, total)
+
+    # Nothing to react to, but hosts like ScreenManager pass every event on.
+    def handle_event(self, event) -> None:
+        pass
+
+    # Moves the animation forward by dt seconds. Without dt one frame at
+    # 60 fps is assumed, for hosts whose update() takes no time step.
+    def update(self, dt: float = None) -> None:
+        if self.done:
+            return
+        if dt is None:
+            dt = 1 / 60
+        self.elapsed += dt
+
+        # Stop once the work is done (or after the fixed duration if there is no work)
+        if self.is_done is None:
+            finished = self.elapsed >= DEFAULT_DURATION
+        else:
+            finished = self.elapsed >= self.min_duration and self.is_done()
+        if finished:
+            self.done = True
+            if self.on_finished is not None:
+                self.on_finished()
+            return
 
-    #Clock to control frame rate
-    clock = pygame.time.Clock()
+        # Update angle for rotation
+        self.angle = (self.angle + ROTATION_SPEED * dt) % 360
 
-    # Colors
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-
-    # Text setup
-    font = pygame.font.Font(None, 32)
-    text = "Booting up system. Please wait..."
-
-    # Square setup
-    square_size = 100
-    angle = 0
-
-    # Flashing text & color timing
-    color_change_time = 0
-    current_color = WHITE
-
-    # Bar graph settings
-    num_bars = 40
-    bar_width = WIDTH // num_bars
-    max_bar_height = 160
-    min_bar_height = 5
-
-    # Create bar data
-    bars = []
-    count = 0
-    for _ in range(num_bars):
-        height = random.randint(20, max_bar_height)
-        bars.append({
-            "height": height,
-            "target": random.randint(min_bar_height, max_bar_height),
-            "color": (random.randint(50, 255), random.randint(50, 255), random.randint(50, 255))})
-
-    # Timer to pick new targets for bars
-    CHANGE_INTERVAL = 2000  # ms
-    last_change = pygame.time.get_ticks()
-
-    # Smooth animation speed
-    SPEED = 0.05  # 0.0–1.0, larger = faster motion
-
-    # Load the image amnd set it
-    image = pygame.image.load("widgets/lab_logo.png")
-    image = pygame.transform.scale(image, (288.5, 27))
-    image_rect = image.get_rect(topleft=(20, 20))
-
-    # A list of stupid loading strings to choose from for comedic effect
-    first_half_strings = ["Re-routing",
-                        "Typing up",
-                        "Downloading",
-                        "Installing",
-                        "Creating",
-                        "Saving",
-                        "Hacking",
-                        "Uploading",
-                        "Booting up",
-                        "Debugging",
-                        "Coding",
-                        "Complexifying",
-                        "Searching up",
-                        "Copying",
-                        "Formatting",
-                        "Fixing",
-                        "Moving",
-                        "Reading",
-                        "Updating",
-                        "Getting",
-                        "Invoking",
-                        "Retrieving",
-                        "Supporting",
-                        "Adding",
-                        "Obtaining",
-                        "Organizing",
-                        "Executing",
-                        "Programming",
-                        "Writing"
-                        
-    ]
-    second_half_strings = ["a bunch of computer hardware",
-                        "copious amounts of microchips",
-                        "very complex stuff, I assure you",
-                        "stuff that is really cool",
-                        "random computer updates",
-                        "a lot of binary code",
-                        "proper coding conventions",
-                        "a really messy computer desktop",
-                        "a barely-contained NULL statement",
-                        "extremely obscure programming facts",
-                        "a lot of useful functions",
-                        "a keen sense of optimism",
-                        "a mountain of cat pictures",
-                        "way too many if-else statements",
-                        "many sleepless nights of coding",
-                        "computer updates that just won't finish",
-                        "a fun attitude with a sense of humour to match",
-                        "the greatest coding project you've ever seen",
-                        "robot stuff. Beep boop! Yep",
-                        "a hip, new loading screen",
-                        "computer stuff that shouldn't be touched",
-                        "a childlike sense of wonder",
-                        "hardworking, loyal morals",
-                        "intrusive thoughts about functions",
-                        "bits and bytes and bits and bytes",
-                        "nothing in particular",
-                        "something REAAAAALLLYY important",
-                        "an inside joke between me, myself, and I",
-                        "a stable, expertly-coded blockchain",
-                        "something really funny. You wouldn't get it",
-                        "something. Don't know what, just something",
-                        "exactly 1000 lines of codes and not one more",
-                        "a random desire to make something fun"
-
-                        
-    ]
-
-    # Add any single piece strings you want to the pool (these will come up super rarely!)
-    strings = ["This is a super rare message. If you see it, congrats!"]
-
-    # Combine strings from both lists
-    for item1 in first_half_strings:
-        for item2 in second_half_strings:
-            strings.append(item1 + " " + item2 + "...")  # combine with a space
+        # Update text color every few seconds
+        self.color_timer += dt
+        if self.color_timer > CHANGE_INTERVAL:
+            self.color_timer = 0.0
+            self.current_color = (random.randint(50, 255), random.randint(50, 255), random.randint(50, 255))
+            self.text = self.messages.next_message()
+
+        # Real progress fills the bars from the left; otherwise they pick random heights
+        if self.get_progress is not None:
+            self.progress = self.get_progress()
+        if self.progress is not None:
+            self.bars.set_progress(*self.progress)
+        else:
+            self.bar_timer += dt
+            if self.bar_timer > CHANGE_INTERVAL:
+                self.bar_timer = 0.0
+                self.bars.randomize(20, MAX_BAR_HEIGHT)
+
+        # Smoothly move current height toward target (at the same pace whatever the frame rate)
+        self.bars.update(dt)
+
+    # Draws the current frame, laid out to fill the whole surface.
+    def draw(self, surface: pygame.Surface) -> None:
+        width, height = surface.get_size()
 
+        # Clear screen
+        surface.fill(BLACK)
 
-    # Main loop
-    start_time = time.time()
-    duration = 5  # seconds
+        # Draw flashing text
+        self.message_text.draw(surface, self.text, self.current_color, (width // 2, height // 4))
 
-    while time.time() - start_time < duration:
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+        #Render logo image
+        surface.blit(self.image, (20, 20))
 
-        # Update angle for rotation
-        angle += 2  # degrees per frame
-        if angle >= 360:
-            angle = 0
+        # Draw rotated square
+        self.square_frames.draw(surface, self.angle, self.current_color, (width // 2, height // 2))
 
-        # Update text color every few seconds
-        current_time = pygame.time.get_ticks()
-        if current_time - color_change_time > 2000:
-            color_change_time = current_time
-            current_color = (
-                random.randint(50, 255),
-                random.randint(50, 255),
-                random.randint(50, 255)
-            )
-            text = random.choice(strings)
+        # Show real progress if we have it
+        if self.progress is not None:
+            done_count, total = self.progress
+            self.progress_text.draw(surface, f"{done_count} / {total} done", WHITE, (width // 2, height // 2 + 110))
 
-        # Clear screen
-        screen.fill(BLACK)
+        # Draw bars
+        self.bars.draw(surface, 0, height, width // NUM_BARS, gap=2)
 
-        # Render flashing text
-        text_surface = font.render(text, True, current_color)
-        text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4))
-        screen.blit(text_surface, text_rect)
 
-        #Render logo image
-        screen.blit(image, image_rect)
+# Runs the loading screen in its own window until it is done (or the window is closed).
+#
+# Parameters: as for LoadingScreen.
+#
+def run_loading_screen(is_done=None, get_progress=None, min_duration: float = 1.0,
+                       messages: widgets.messages.MessageProvider = None):
+    #Initializes Pygame
+    pygame.init()
 
-        # Create and rotate square
-        square_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-        pygame.draw.rect(square_surface, current_color, (0, 0, square_size, square_size))
-        rotated_square = pygame.transform.rotate(square_surface, angle)
-        rect = rotated_square.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+    #Screen settings
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Now Loading...")
 
-        # Draw square
-        screen.blit(rotated_square, rect)
+    #Clock to control frame rate
+    clock = pygame.time.Clock()
 
-        # Time handling for target updates
-        now = pygame.time.get_ticks()
-        if now - last_change > CHANGE_INTERVAL:
-            last_change = now
-            for bar in bars:
-                bar["target"] = random.randint(20, max_bar_height)
+    loading_screen = LoadingScreen(is_done, get_progress, min_duration, messages=messages)
+    dt = 0.0
 
-        # Smoothly move current height toward target
-        for bar in bars:
-            bar["height"] += (bar["target"] - bar["height"]) * SPEED
+    # Main loop
+    while not loading_screen.done:
+        # Closing the window just stops the loading screen early
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            loading_screen.handle_event(event)
 
-        # Draw bars
-        for i, bar in enumerate(bars):
-            x = i * bar_width
-            y = HEIGHT - bar["height"]
-            pygame.draw.rect(screen, bar["color"], (x, y, bar_width - 2, bar["height"]))
+        loading_screen.update(dt)
+        loading_screen.draw(screen)
 
         # Update display
         pygame.display.flip()
 
         # Cap frame rate
-        clock.tick(60)
+        dt = clock.tick(60) / 1000
 
     pygame.quit()
-
@@ -0,0 +1,129 @@
+# This module picks the funny messages shown on the loading screen.
+#
+# A message is a random first half ("Downloading") joined to a random second
+# half ("a mountain of cat pictures"), with the odd rare one-off message mixed
+# in. Both halves are drawn on demand, so no list of every combination is ever
+# built and startup doesn't depend on how many fragments there are.
+#
+# More fragments can be shipped as a JSON message pack:
+#   {"first": ["Re-routing", ...],
+#    "second": ["a bunch of computer hardware", ...],
+#    "rare": [{"text": "A one-off message!", "weight": 0.001}, ...]}
+# where each rare message's weight is its chance of being picked each time.
+# A pack is only read when the first message is asked for.
+
+import json
+import random
+
+
+# A list of stupid loading strings to choose from for comedic effect
+FIRST_HALF_STRINGS = ["Re-routing",
+                      "Typing up",
+                      "Downloading",
+                      "Installing",
+                      "Creating",
+                      "Saving",
+                      "Hacking",
+                      "Uploading",
+                      "Booting up",
+                      "Debugging",
+                      "Coding",
+                      "Complexifying",
+                      "Searching up",
+                      "Copying",
+                      "Formatting",
+                      "Fixing",
+                      "Moving",
+                      "Reading",
+                      "Updating",
+                      "Getting",
+                      "Invoking",
+                      "Retrieving",
+                      "Supporting",
+                      "Adding",
+                      "Obtaining",
+                      "Organizing",
+                      "Executing",
+                      "Programming",
+                      "Writing"]
+
+SECOND_HALF_STRINGS = ["a bunch of computer hardware",
+                       "copious amounts of microchips",
+                       "very complex stuff, I assure you",
+                       "stuff that is really cool",
+                       "random computer updates",
+                       "a lot of binary code",
+                       "proper coding conventions",
+                       "a really messy computer desktop",
+                       "a barely-contained NULL statement",
+                       "extremely obscure programming facts",
+                       "a lot of useful functions",
+                       "a keen sense of optimism",
+                       "a mountain of cat pictures",
+                       "way too many if-else statements",
+                       "many sleepless nights of coding",
+                       "computer updates that just won't finish",
+                       "a fun attitude with a sense of humour to match",
+                       "the greatest coding project you've ever seen",
+                       "robot stuff. Beep boop! Yep",
+                       "a hip, new loading screen",
+                       "computer stuff that shouldn't be touched",
+                       "a childlike sense of wonder",
+                       "hardworking, loyal morals",
+                       "intrusive thoughts about functions",
+                       "bits and bytes and bits and bytes",
+                       "nothing in particular",
+                       "something REAAAAALLLYY important",
+                       "an inside joke between me, myself, and I",
+                       "a stable, expertly-coded blockchain",
+                       "something really funny. You wouldn't get it",
+                       "something. Don't know what, just something",
+                       "exactly 1000 lines of codes and not one more",
+                       "a random desire to make something fun"]
+
+# Add any single piece strings you want to the pool (these will come up super rarely!)
+# Each comes with its chance of showing up per message.
+RARE_STRINGS = [("This is a super rare message. If you see it, congrats!", 0.001)]
+
+
+# Message Provider Class
+#
+# Parameters:
+# - first_halves, second_halves: Fragments joined into "<first> <second>..." messages.
+# - rare: List of (message, weight) pairs shown as-is, each with a weight chance per pick.
+# - pack_path: Optional message pack file whose fragments replace the ones above.
+#
+class MessageProvider:
+    def __init__(self, first_halves=FIRST_HALF_STRINGS, second_halves=SECOND_HALF_STRINGS, rare=RARE_STRINGS,
+                 pack_path: str = None):
+        self.first_halves = first_halves
+        self.second_halves = second_halves
+        self.rare = rare
+        self.pack_path = pack_path
+
+    # Reads the message pack, if any. Only the first call does any work.
+    def _load_pack(self) -> None:
+        if self.pack_path is None:
+            return
+        with open(self.pack_path, encoding="utf-8") as f:
+            pack = json.load(f)
+        self.pack_path = None
+
+        if not pack.get("first") or not pack.get("second"):
+            raise ValueError("A message pack needs non-empty \"first\" and \"second\" lists.")
+        self.first_halves = pack["first"]
+        self.second_halves = pack["second"]
+        self.rare = [(item["text"], float(item.get("weight", 0.001))) for item in pack.get("rare", [])]
+
+    # Returns a new random message.
+    def next_message(self) -> str:
+        self._load_pack()
+
+        # Roll for each rare message first
+        roll = random.random()
+        for text, weight in self.rare:
+            if roll < weight:
+                return text
+            roll -= weight
+
+        return random.choice(self.first_halves) + " " + random.choice(self.second_halves) + "..."
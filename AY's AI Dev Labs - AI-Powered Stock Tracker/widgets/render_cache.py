@@ -0,0 +1,62 @@
+# This module keeps the loading screen from rebuilding the same graphics on
+# every frame.
+#
+# - CachedText keeps a rendered line of text until its text or colour changes.
+# - SquareFrames holds every frame of the spinning square, worked out once.
+#
+# The square turns 2 degrees per frame, so it only ever shows 180 angles. Its
+# colour is picked at random every couple of seconds, so pre-rendered images
+# per colour would hardly ever be reused; instead the table holds the four
+# corner points for each angle, and drawing a frame is a single polygon fill in
+# whatever colour is current, with no new surfaces at all.
+
+import math
+
+import pygame
+
+
+# Caches one rendered line of text.
+class CachedText:
+    def __init__(self, font: pygame.font.Font, antialias: bool = True):
+        self.font = font
+        self.antialias = antialias
+        self._key = None
+        self._surface = None
+
+    # Returns the rendered text, only calling font.render when text or color changed.
+    def render(self, text: str, color) -> pygame.Surface:
+        key = (text, tuple(color))
+        if key != self._key:
+            self._key = key
+            self._surface = self.font.render(text, self.antialias, color)
+        return self._surface
+
+    # Draws the text centered on a point.
+    def draw(self, surface: pygame.Surface, text: str, color, center) -> None:
+        rendered = self.render(text, color)
+        surface.blit(rendered, rendered.get_rect(center=center))
+
+
+# The frames of a square turning "step" degrees at a time.
+class SquareFrames:
+    def __init__(self, size: float, step: int = 2):
+        self.step = step
+        half = (size - 1) / 2  # polygon fills include their edge pixels
+        corners = [(-half, -half), (half, -half), (half, half), (-half, half)]
+
+        # Corner offsets from the centre for every angle. pygame.transform.rotate
+        # turns counterclockwise, and y points down, hence the sign on sin.
+        self.frames = []
+        for frame in range(360 // step):
+            radians = math.radians(frame * step)
+            cos, sin = math.cos(radians), math.sin(radians)
+            self.frames.append([(x * cos + y * sin, -x * sin + y * cos) for x, y in corners])
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    # Draws the frame for an angle (in degrees) centred on a point.
+    def draw(self, surface: pygame.Surface, angle: float, color, center) -> None:
+        cx, cy = center
+        corners = self.frames[int(angle // self.step) % len(self.frames)]
+        pygame.draw.polygon(surface, color, [(cx + x, cy + y) for x, y in corners])
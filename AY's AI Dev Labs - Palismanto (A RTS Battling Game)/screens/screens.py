@@ -10,6 +10,16 @@ except Exception:
 import time
 import random
 import math
+import threading
+import os
+
+# The bar visualizer is shared with the stock tracker next to this game, which
+# keeps the only copy in its widgets package
+TRACKER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "AY's AI Dev Labs - AI-Powered Stock Tracker")
+sys.path.append(TRACKER_DIR)
+
+from widgets.bar_visualizer import AudioLevels, BarVisualizer
 
 # Initialize Pygame
 pygame.init()
@@ -54,6 +64,8 @@ class TitleScreen(Screen):
         super().__init__(manager)
         self.button_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2, 200, 50)
         self.soundtrack = play_mp3("royalty_free_music/Palismanto_Title_Card.mp3", volume=80)
+        # Start analysing the menu music now, so its bars are ready by the time the menu opens
+        menu_music_levels(MENU_BAR_COUNT)
         
         # Bouncing squares state array
         self.squares = []
@@ -145,6 +157,45 @@ class TitleScreen(Screen):
     # (squares already drawn behind UI)
 
 
+# Music of the main menu, and the number of bars that follow it
+MENU_MUSIC = "royalty_free_music/Palismanto_Menu.mp3"
+MENU_BAR_COUNT = 8
+
+# The menu music's analysed loudness, per number of bands. Decoding and
+# analysing a whole track takes most of a second, so it runs once on a
+# background thread instead of freezing the screen that asked for it.
+_menu_music_levels = {}
+_menu_music_started = set()
+_menu_music_lock = threading.Lock()
+
+
+# Works out the menu music's loudness split into "bands" bands (run on a background thread).
+def _analyse_menu_music(bands):
+    levels = AudioLevels.from_file(MENU_MUSIC, bands)
+    with _menu_music_lock:
+        _menu_music_levels[bands] = levels
+
+
+# Returns the AudioLevels of the menu music split into "bands" bands, or None
+# while they are still being worked out (or if the track can't be decoded).
+# The first call starts the analysis, so calling it early gives it a head start.
+def menu_music_levels(bands):
+    with _menu_music_lock:
+        if bands not in _menu_music_started:
+            _menu_music_started.add(bands)
+            threading.Thread(target=_analyse_menu_music, args=(bands,), daemon=True).start()
+        return _menu_music_levels.get(bands)
+
+
+# Returns how far (in seconds) a soundtrack has played, or None if that isn't known.
+def playback_seconds(player):
+    try:
+        milliseconds = player.get_time()
+    except Exception:
+        return None
+    return milliseconds / 1000 if milliseconds is not None and milliseconds >= 0 else None
+
+
 # Main Menu Screen
 class MainMenuScreen(Screen):
     def __init__(self, manager, soundtrack=None):
@@ -153,28 +204,38 @@ class MainMenuScreen(Screen):
         if soundtrack is not None:
             self.soundtrack = soundtrack
         else:
-            self.soundtrack = play_mp3("royalty_free_music/Palismanto_Menu.mp3", volume=80)
+            self.soundtrack = play_mp3(MENU_MUSIC, volume=80)
 
         # Animated bars at the bottom
-        self.bar_count = 8
+        self.bar_count = MENU_BAR_COUNT
         self.bar_width = max(8, WIDTH // (self.bar_count * 3))
         self.bar_spacing = self.bar_width // 2
         self.bar_max_height = 120
         # Per-bar attributes (phase, speed, color)
-        self.bars = []
+        self.bar_phases = [i * (2 * math.pi / max(1, self.bar_count)) for i in range(self.bar_count)]
+        self.bar_speeds = [0.8 + (i % 4) * 0.25 for i in range(self.bar_count)]
+        colors = []
         for i in range(self.bar_count):
-            phase = i * (2 * math.pi / max(1, self.bar_count))
-            speed = 0.8 + (i % 4) * 0.25
             c = pygame.Color(0, 0, 0)
             c.hsva = (i * (360 / max(1, self.bar_count)), 75, 85, 100)
-            color = (c.r, c.g, c.b)
-            self.bars.append({'phase': phase, 'speed': speed, 'color': color})
+            colors.append((c.r, c.g, c.b))
+        self.bars = BarVisualizer(self.bar_count, self.bar_max_height, colors=colors, speed=0.3)
         self.bar_time = 0.0
 
     def update(self):
         # advance animation time for bars
         self.bar_time += 0.06
 
+        # The bars follow the music once it has been analysed, and bob on sine waves until then
+        music_levels = menu_music_levels(self.bar_count)
+        position = playback_seconds(self.soundtrack) if music_levels is not None else None
+        if position is not None:
+            self.bars.set_levels(music_levels.at(position))
+            self.bars.update()
+        else:
+            self.bars.set_wave(self.bar_time, self.bar_phases, self.bar_speeds)
+            self.bars.snap()
+
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
             self.manager.go_to(GameScreen(self.manager))  # Go to the game screen
@@ -208,13 +269,8 @@ class MainMenuScreen(Screen):
         total_width = self.bar_count * self.bar_width + (self.bar_count - 1) * self.bar_spacing
         start_x = (WIDTH - total_width) // 2
         bottom_margin = 12
-        for i, bar in enumerate(self.bars):
-            h = (math.sin(self.bar_time * bar['speed'] + bar['phase']) + 1) / 2
-            height = int(h * self.bar_max_height)
-            x = start_x + i * (self.bar_width + self.bar_spacing)
-            y = HEIGHT - bottom_margin - height
-            rect = pygame.Rect(x, y, self.bar_width, height)
-            pygame.draw.rect(surface, bar['color'], rect)
+        self.bars.draw(surface, start_x, HEIGHT - bottom_margin, self.bar_width + self.bar_spacing,
+                       gap=self.bar_spacing)
 
 
 class InstructionScreen(Screen):